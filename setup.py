@@ -10,6 +10,20 @@ setup(
         "spacy>=3.0.0",
         "typing-extensions>=4.0.0",  # For better typing support
     ],
+    extras_require={
+        "fast": [
+            "numba>=0.56.0",  # JIT-compiled saliency scoring
+        ],
+        "faiss": [
+            "faiss-cpu>=1.7.0",  # Similarity search indexes
+        ],
+        "simsimd": [
+            "simsimd>=6.0.0",  # SIMD int8 similarity kernels
+        ],
+        "http2": [
+            "h2>=4.0.0",  # HTTP/2 connections to the OpenAI API
+        ],
+    },
     author="Xingyu Bruce Liu",
     author_email="xingyuliu@ucla.edu",
     description="A framework for modeling agent thoughts and conversations",
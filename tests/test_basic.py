@@ -1,7 +1,10 @@
 import unittest
 import asyncio
-from thoughtful_agents.models import Agent, Conversation, Human
-from thoughtful_agents.models.enums import MentalObjectType
+import threading
+from unittest.mock import patch
+from thoughtful_agents.models import Agent, Conversation, Event, Human, Memory
+from thoughtful_agents.models.enums import EventType, MentalObjectType
+from thoughtful_agents.utils.semantic_cache import SemanticInterpCache
 
 class TestBasicFunctionality(unittest.TestCase):
     def test_imports(self):
@@ -13,12 +16,229 @@ class TestBasicFunctionality(unittest.TestCase):
         """Test that an agent can be created."""
         agent = Agent(name="TestAgent")
         self.assertEqual(agent.name, "TestAgent")
+        self.assertEqual(len(agent.id), 32)
+        self.assertNotEqual(agent.id, Agent(name="TestAgent").id)
     
+    def test_agents_share_text_splitter(self):
+        """Test that agents reuse one sentence splitter instead of loading spaCy each time."""
+        self.assertIs(Agent(name="A").text_splitter, Agent(name="B").text_splitter)
+    
+    def test_human_response_does_not_block(self):
+        """Test that waiting for human input leaves the event loop free for other tasks."""
+        typed = threading.Event()
+
+        def fake_input(prompt):
+            self.assertEqual(prompt, "Alice: ")
+            typed.wait(timeout=5)
+            return "  hello  "
+
+        async def async_test():
+            response = asyncio.ensure_future(Human(name="Alice").get_response())
+            # Runs while input() is still waiting
+            await asyncio.sleep(0.01)
+            self.assertFalse(response.done())
+            typed.set()
+            return await response
+
+        with patch("builtins.input", fake_input):
+            self.assertEqual(asyncio.run(async_test()), "hello")
+
     def test_conversation_creation(self):
         """Test that a conversation can be created."""
         conversation = Conversation(context="Test conversation")
         self.assertEqual(conversation.context, "Test conversation")
     
+    def test_conversation_lookups(self):
+        """Test that events and participants can be looked up by ID."""
+        conversation = Conversation(context="Test conversation")
+        human = Human(name="Alice")
+        conversation.add_participant(human)
+        event = Event(
+            participant_id=human.id,
+            type=EventType.UTTERANCE,
+            content="Hello",
+            turn_number=0,
+            embedding=[1.0, 0.0]
+        )
+        conversation.record_event(event)
+
+        self.assertIs(conversation.get_by_id(event.id), event)
+        self.assertIs(conversation.get_by_id(str(event.id)), event)
+        self.assertIsNone(conversation.get_by_id("not-an-id"))
+        self.assertEqual(event.participant_name, "Alice")
+        self.assertIs(conversation.get_participant_by_id(human.id), human)
+
+        agent = Agent(name="Bot")
+        conversation.add_participant(agent)
+        self.assertEqual(conversation.get_agents(), [agent])
+
+        conversation.remove_participant(human)
+        conversation.remove_participant(agent)
+        self.assertIsNone(conversation.get_participant_by_id(human.id))
+        self.assertEqual(conversation.get_agents(), [])
+
+    def test_event_compute_embedding(self):
+        """Test that events only compute embeddings in the constructor when asked to."""
+        calls = []
+
+        def fake_get_embedding_sync(text):
+            calls.append(text)
+            return [3.0, 4.0]
+
+        with patch("thoughtful_agents.models.conversation.get_embedding_sync", fake_get_embedding_sync):
+            deferred = Event(participant_id="p", type=EventType.UTTERANCE, content="Hello", turn_number=0,
+                             compute_embedding=False)
+            self.assertIsNone(deferred.embedding)
+            self.assertEqual(calls, [])
+
+            event = Event(participant_id="p", type=EventType.UTTERANCE, content="Hello", turn_number=0,
+                          interpretation="A greeting", compute_embedding=True)
+
+        self.assertEqual(calls, ["Hello", "A greeting"])
+        self.assertEqual([round(x, 6) for x in event.embedding.tolist()], [0.6, 0.8])
+        self.assertIsNotNone(event.interpretation_embedding)
+
+    def test_conversation_history(self):
+        """Test that the formatted history covers the last n events."""
+        conversation = Conversation(context="Test conversation")
+        events = []
+        for i in range(7):
+            event = Event(
+                participant_id="p",
+                type=EventType.UTTERANCE,
+                content=f"message {i}",
+                turn_number=i,
+                participant_name="Bob",
+                embedding=[1.0, 0.0]
+            )
+            conversation.record_event(event)
+            events.append(event)
+
+        expected = "".join(f"Bob: message {i}\n" for i in range(2, 7))
+        self.assertEqual(conversation.get_conversation_history(5), expected)
+        self.assertEqual(conversation.get_conversation_history(5, until_event=events[-1]), expected[:-len("Bob: message 6\n")])
+        self.assertEqual(conversation.get_conversation_history(30), "".join(f"Bob: message {i}\n" for i in range(7)))
+
+    def test_trivial_utterances_skip_interpretation(self):
+        """Test that short acknowledgements are interpreted as themselves without an LLM call."""
+        async def failing_get_completion(**kwargs):
+            raise AssertionError("get_completion should not be called")
+
+        conversation = Conversation(context="Test conversation")
+        for content in ["ok", "Thank you!", "👍", "   "]:
+            event = Event(participant_id="p", type=EventType.UTTERANCE, content=content, turn_number=0,
+                          participant_name="Bob", embedding=[1.0, 0.0])
+            conversation.record_event(event)
+            with patch("thoughtful_agents.models.conversation.get_completion", failing_get_completion):
+                self.assertEqual(asyncio.run(conversation.interpret_event(event)), content)
+            self.assertEqual(event.interpretation, content)
+            self.assertIsNotNone(event.interpretation_embedding)
+
+    def test_cached_interpretations_not_shared_across_speakers(self):
+        """Test that a cached interpretation is only reused for the same speaker and history."""
+        prompts = []
+
+        class FakeBatcher:
+            async def embed(self, text):
+                return [0.0, 1.0]
+
+        async def fake_get_completion(system_prompt, user_prompt, **kwargs):
+            prompts.append(user_prompt)
+            return {"text": f"Interpretation {len(prompts)}"}
+
+        def interpret(name):
+            conversation = Conversation(context="Test conversation")
+            event = Event(participant_id="p", type=EventType.UTTERANCE, content="Yes, I think that works for me",
+                          turn_number=0, participant_name=name, embedding=[1.0, 0.0])
+            conversation.record_event(event)
+            return asyncio.run(conversation.interpret_event(event))
+
+        with patch("thoughtful_agents.models.conversation.get_completion", fake_get_completion), \
+                patch("thoughtful_agents.models.conversation.embedding_batcher", FakeBatcher()), \
+                patch("thoughtful_agents.models.conversation.interpretation_cache", SemanticInterpCache()):
+            self.assertEqual(interpret("Alice"), "Interpretation 1")
+            self.assertEqual(interpret("Bob"), "Interpretation 2")
+            self.assertEqual(interpret("Alice"), "Interpretation 1")
+
+        self.assertEqual(len(prompts), 2)
+
+    def test_send_message_interprets_in_background(self):
+        """Test that send_message returns before the interpretation is ready."""
+        class FakeBatcher:
+            async def embed(self, text):
+                return [0.0, 1.0, float(len(text))]
+
+        async def async_test():
+            release = asyncio.Event()
+
+            async def slow_get_completion(**kwargs):
+                await release.wait()
+                return {"text": "Alice is asking about weekend plans."}
+
+            conversation = Conversation(context="Test conversation")
+            human = Human(name="Alice")
+            conversation.add_participant(human)
+            with patch("thoughtful_agents.models.conversation.get_completion", slow_get_completion):
+                event = await human.send_message("What are you all doing this weekend?", conversation)
+                self.assertEqual(event.interpretation, "")
+                self.assertIsNotNone(event.embedding)
+
+                release.set()
+                interpretation = await event.wait_for_interpretation()
+                await conversation.wait_for_interpretations()
+            return interpretation, event
+
+        with patch("thoughtful_agents.models.conversation.embedding_batcher", FakeBatcher()):
+            interpretation, event = asyncio.run(async_test())
+
+        self.assertEqual(interpretation, "Alice is asking about weekend plans.")
+        self.assertEqual(event.interpretation, interpretation)
+
+    def test_recalibration_waits_for_interpretation(self):
+        """Test that saliency recalibration uses the interpretation from a background task."""
+        agent = Agent(name="TestAgent")
+        memory = Memory(agent_id=agent.id, type=MentalObjectType.MEMORY_LONG_TERM, content="memory",
+                        generated_turn=0, last_accessed_turn=0, embedding=[0.0, 1.0], compute_embedding=False)
+        agent.memory_store.add(memory)
+        event = Event(participant_id="p", type=EventType.UTTERANCE, content="Hello there everyone",
+                      turn_number=0, embedding=[1.0, 0.0])
+
+        async def interpret():
+            await asyncio.sleep(0.01)
+            event.interpretation = "A greeting"
+            event.interpretation_embedding = [0.0, 1.0]
+
+        async def async_test():
+            event.interpretation_task = asyncio.ensure_future(interpret())
+            await agent.recalibrate_saliency_for_event(event)
+
+        asyncio.run(async_test())
+        self.assertAlmostEqual(memory.saliency, 1.0, places=5)
+
+    def test_broadcast_parallel_and_sequential(self):
+        """Test that agents think concurrently by default and one at a time with parallel=False."""
+        log = []
+
+        class RecordingAgent(Agent):
+            async def think(self, conversation, event):
+                log.append(("start", self.name))
+                await asyncio.sleep(0)
+                log.append(("end", self.name))
+
+        conversation = Conversation(context="Test conversation")
+        for name in ("A", "B"):
+            conversation.add_participant(RecordingAgent(name=name))
+        event = Event(participant_id="p", type=EventType.UTTERANCE, content="Hello there everyone",
+                      turn_number=0, embedding=[1.0, 0.0], pred_next_turn="anyone")
+        conversation.record_event(event)
+
+        asyncio.run(conversation.broadcast_event(event))
+        self.assertEqual(log[:2], [("start", "A"), ("start", "B")])
+
+        log.clear()
+        asyncio.run(conversation.broadcast_event(event, parallel=False))
+        self.assertEqual(log, [("start", "A"), ("end", "A"), ("start", "B"), ("end", "B")])
+
     def test_memory_initialization(self):
         """Test that an agent's memory can be initialized."""
         agent = Agent(name="TestAgent")
@@ -26,6 +246,24 @@ class TestBasicFunctionality(unittest.TestCase):
         self.assertEqual(len(agent.memory_store.long_term_memory), 1)
         self.assertEqual(agent.memory_store.long_term_memory[0].content, "Test memory")
 
+    def test_async_memory_initialization(self):
+        """Test that memories can be initialized with one batched embedding request."""
+        calls = []
+
+        async def fake_get_embeddings_async(texts):
+            calls.append(list(texts))
+            return [[1.0, float(len(text))] for text in texts]
+
+        agent = Agent(name="TestAgent")
+        with patch("thoughtful_agents.models.participant.get_embeddings_async", fake_get_embeddings_async):
+            asyncio.run(agent.initialize_memory_async("I like cats. I have two dogs."))
+
+        self.assertEqual(calls, [["I like cats.", "I have two dogs."]])
+
+        memories = agent.memory_store.long_term_memory
+        self.assertEqual([m.content for m in memories], ["I like cats.", "I have two dogs."])
+        self.assertTrue(all(m.embedding is not None for m in memories))
+
     def test_async_functionality(self):
         """Test that async functionality works."""
         async def async_test():
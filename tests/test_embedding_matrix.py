@@ -0,0 +1,142 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+
+from thoughtful_agents.models import Conversation, Event, EventType
+from thoughtful_agents.utils import embedding_matrix
+from thoughtful_agents.utils.embedding_matrix import EmbeddingMatrix, normalize_embedding, quantize_int8
+
+class TestEmbeddingMatrix(unittest.TestCase):
+    def test_append_grows_capacity(self):
+        """Test that appending past capacity keeps all rows."""
+        matrix = EmbeddingMatrix(initial_capacity=2)
+        for i in range(5):
+            self.assertEqual(matrix.append([float(i), 1.0]), i)
+
+        self.assertEqual(len(matrix), 5)
+        self.assertEqual(matrix.capacity, 8)
+        np.testing.assert_array_equal(matrix.view()[:, 0], np.arange(5, dtype=np.float32))
+
+    def test_extend(self):
+        """Test that extend matches appending rows one at a time and grows the capacity by doubling."""
+        rng = np.random.default_rng(2)
+        rows = rng.standard_normal((10, 4)).astype(np.float32)
+        for quantize in (False, True):
+            appended, extended = EmbeddingMatrix(initial_capacity=2, quantize=quantize), EmbeddingMatrix(initial_capacity=2, quantize=quantize)
+            for row in rows[:3]:
+                appended.append(row)
+                extended.append(row)
+            for row in rows[3:]:
+                appended.append(row)
+            extended.extend(rows[3:])
+
+            self.assertEqual(extended.capacity, 16)
+            np.testing.assert_array_equal(extended.view(), appended.view())
+            np.testing.assert_allclose(extended.scales(), appended.scales())
+
+    def test_topk(self):
+        """Test that topk returns the best rows in descending score order."""
+        matrix = EmbeddingMatrix()
+        for row in ([1.0, 0.0], [0.0, 1.0], [0.7, 0.7]):
+            matrix.append(row)
+
+        indices, scores = matrix.topk(np.array([1.0, 0.2], dtype=np.float32), k=2)
+        self.assertEqual(list(indices), [0, 2])
+        self.assertGreater(scores[0], scores[1])
+
+    def test_topk_empty(self):
+        """Test that an empty matrix returns no results."""
+        indices, _ = EmbeddingMatrix().topk(np.ones(3, dtype=np.float32), k=3)
+        self.assertEqual(len(indices), 0)
+
+    def test_quantized_scores_match_float(self):
+        """Test that int8 storage gives scores close to float32 storage."""
+        rng = np.random.default_rng(0)
+        rows = rng.standard_normal((10, 64)).astype(np.float32)
+        query = rng.standard_normal(64).astype(np.float32)
+        exact, quantized = EmbeddingMatrix(initial_capacity=4), EmbeddingMatrix(initial_capacity=4, quantize=True)
+        for row in rows:
+            exact.append(row)
+            quantized.append(row)
+
+        self.assertEqual(quantized.view().dtype, np.int8)
+        np.testing.assert_allclose(quantized.scores(query), exact.scores(query), atol=0.5)
+
+    def test_quantized_scores_without_simsimd(self):
+        """Test that the NumPy int8 scoring path agrees with the default path."""
+        rng = np.random.default_rng(1)
+        matrix = EmbeddingMatrix(quantize=True)
+        for row in rng.standard_normal((20, 32)).astype(np.float32):
+            matrix.append(normalize_embedding(row))
+        query = normalize_embedding(rng.standard_normal(32))
+
+        default_scores = matrix.scores(query)
+        with patch.object(embedding_matrix, "SIMSIMD_AVAILABLE", False):
+            numpy_scores = matrix.scores(query)
+        np.testing.assert_allclose(default_scores, numpy_scores, atol=0.02)
+
+    def test_memory_mapped_rows(self):
+        """Test that a file-backed matrix keeps its rows across growth and can be reopened."""
+        rows = np.random.default_rng(5).standard_normal((5, 8)).astype(np.float32)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "embeddings.f32")
+            matrix = EmbeddingMatrix(initial_capacity=2, path=path)
+            for row in rows:
+                matrix.append(row)
+            self.assertIsInstance(matrix.view(), np.memmap)
+            np.testing.assert_array_equal(matrix.view(), rows)
+            matrix.flush()
+
+            reopened = EmbeddingMatrix.open(path, rows=5, dim=8)
+            np.testing.assert_array_equal(reopened.view(), rows)
+            reopened.extend(rows)
+            self.assertEqual(len(reopened), 10)
+            np.testing.assert_array_equal(reopened.view()[5:], rows)
+
+        with self.assertRaises(ValueError):
+            EmbeddingMatrix(quantize=True, path=path)
+
+    def test_quantize_int8(self):
+        """Test that quantization uses the full int8 range and round-trips."""
+        values, scale = quantize_int8([0.5, -1.0, 0.25])
+        self.assertEqual(values.dtype, np.int8)
+        self.assertEqual(int(np.abs(values).max()), 127)
+        np.testing.assert_allclose(values * scale, [0.5, -1.0, 0.25], atol=scale)
+
+    def test_normalize_embedding(self):
+        """Test that embeddings are scaled to unit length and zeros are left alone."""
+        np.testing.assert_allclose(normalize_embedding([3.0, 4.0]), [0.6, 0.8])
+        np.testing.assert_array_equal(normalize_embedding([0.0, 0.0]), [0.0, 0.0])
+
+    def test_normalize_embedding_reuses_read_only_unit_arrays(self):
+        """Test that read-only unit embeddings are not copied, while writable ones are."""
+        unit = np.frombuffer(np.array([0.6, 0.8], dtype=np.float32).tobytes(), dtype=np.float32)
+        self.assertIs(normalize_embedding(unit), unit)
+
+        writable = np.array([0.6, 0.8], dtype=np.float32)
+        self.assertIsNot(normalize_embedding(writable), writable)
+        not_unit = np.frombuffer(np.array([3.0, 4.0], dtype=np.float32).tobytes(), dtype=np.float32)
+        np.testing.assert_allclose(normalize_embedding(not_unit), [0.6, 0.8])
+
+class TestConversationEmbeddings(unittest.TestCase):
+    def test_topk_similar(self):
+        """Test that recorded events with embeddings can be searched."""
+        conversation = Conversation(context="Test conversation")
+        for i, embedding in enumerate(([1.0, 0.0], [0.0, 1.0])):
+            conversation.record_event(Event(
+                participant_id="p",
+                type=EventType.UTTERANCE,
+                content=f"utterance {i}",
+                turn_number=i,
+                embedding=embedding
+            ))
+
+        results = conversation.topk_similar(np.array([0.1, 0.9], dtype=np.float32), k=1)
+        self.assertEqual([event.content for event in results], ["utterance 1"])
+        self.assertEqual(conversation.event_history[1].emb_idx, 1)
+        self.assertAlmostEqual(float(np.linalg.norm(conversation.event_history[0].embedding)), 1.0, places=6)
+
+if __name__ == "__main__":
+    unittest.main()
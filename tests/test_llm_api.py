@@ -0,0 +1,131 @@
+import unittest
+import asyncio
+import os
+import base64
+from unittest.mock import patch
+import numpy as np
+
+from thoughtful_agents.utils.llm_api import (
+    EmbeddingBatcher, get_async_client, get_client, close_clients, aclose_async_client, _decode_embedding
+)
+
+class TestEmbeddingBatcher(unittest.TestCase):
+    def test_concurrent_requests_share_one_call(self):
+        """Test that concurrent embed() calls are sent as one deduplicated batch."""
+        calls = []
+
+        async def fake_get_embeddings_async(texts, model=None):
+            calls.append(list(texts))
+            return [[float(len(text))] for text in texts]
+
+        async def async_test():
+            batcher = EmbeddingBatcher(max_delay=0.01)
+            return await asyncio.gather(
+                batcher.embed("a"),
+                batcher.embed("bb"),
+                batcher.embed("a")
+            )
+
+        with patch("thoughtful_agents.utils.llm_api.get_embeddings_async", fake_get_embeddings_async):
+            results = asyncio.run(async_test())
+
+        self.assertEqual(calls, [["a", "bb"]])
+        self.assertEqual(results, [[1.0], [2.0], [1.0]])
+
+    def test_batch_size_triggers_flush(self):
+        """Test that reaching batch_size flushes without waiting for the timer."""
+        calls = []
+
+        async def fake_get_embeddings_async(texts, model=None):
+            calls.append(list(texts))
+            return [[0.0] for _ in texts]
+
+        async def async_test():
+            batcher = EmbeddingBatcher(batch_size=2, max_delay=10.0)
+            return await asyncio.gather(batcher.embed("a"), batcher.embed("b"))
+
+        with patch("thoughtful_agents.utils.llm_api.get_embeddings_async", fake_get_embeddings_async):
+            asyncio.run(async_test())
+
+        self.assertEqual(calls, [["a", "b"]])
+
+    def test_separate_event_loops(self):
+        """Test that a batch left pending by a finished event loop does not block later loops."""
+        calls = []
+
+        async def fake_get_embeddings_async(texts, model=None):
+            calls.append(list(texts))
+            return [[float(len(text))] for text in texts]
+
+        batcher = EmbeddingBatcher(max_delay=0.01)
+
+        async def abandon():
+            # The loop finishes before the flush timer fires
+            asyncio.ensure_future(batcher.embed("a"))
+
+        async def embed():
+            return await asyncio.wait_for(batcher.embed("bb"), timeout=1.0)
+
+        with patch("thoughtful_agents.utils.llm_api.get_embeddings_async", fake_get_embeddings_async):
+            asyncio.run(abandon())
+            self.assertEqual(asyncio.run(embed()), [2.0])
+            self.assertEqual(asyncio.run(embed()), [2.0])
+
+        self.assertEqual(calls, [["bb"], ["bb"]])
+
+    def test_errors_propagate_to_callers(self):
+        """Test that a failed batch raises in every waiting caller."""
+        async def failing_get_embeddings_async(texts, model=None):
+            raise RuntimeError("boom")
+
+        async def async_test():
+            batcher = EmbeddingBatcher()
+            return await asyncio.gather(batcher.embed("a"), batcher.embed("b"), return_exceptions=True)
+
+        with patch("thoughtful_agents.utils.llm_api.get_embeddings_async", failing_get_embeddings_async):
+            results = asyncio.run(async_test())
+
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+
+class TestDecodeEmbedding(unittest.TestCase):
+    def test_base64_and_list(self):
+        """Test that base64 float32 and plain list embeddings decode to the same array."""
+        values = np.array([0.5, -1.25, 3.0], dtype=np.float32)
+        decoded = _decode_embedding(base64.b64encode(values.tobytes()).decode())
+        self.assertEqual(decoded.dtype, np.float32)
+        np.testing.assert_array_equal(decoded, values)
+        np.testing.assert_array_equal(_decode_embedding([0.5, -1.25, 3.0]), values)
+
+class TestClients(unittest.TestCase):
+    @patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"})
+    def test_clients_are_reused(self):
+        """Test that API clients are shared instead of created per request."""
+        self.assertIs(get_client(), get_client())
+
+        async def get_twice():
+            return get_async_client(), get_async_client()
+
+        first, second = asyncio.run(get_twice())
+        self.assertIs(first, second)
+        # A new event loop gets its own client, since pooled connections are bound to a loop
+        self.assertIsNot(asyncio.run(get_twice())[0], first)
+
+    @patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"})
+    def test_clients_can_be_closed(self):
+        """Test that closed clients release their connections and are replaced on next use."""
+        client = get_client()
+        close_clients()
+        self.assertTrue(client.is_closed())
+        self.assertIsNot(get_client(), client)
+
+        async def close_and_reopen():
+            first = get_async_client()
+            await aclose_async_client()
+            return first, get_async_client()
+
+        first, second = asyncio.run(close_and_reopen())
+        self.assertTrue(first.is_closed())
+        self.assertIsNot(first, second)
+
+if __name__ == "__main__":
+    unittest.main()
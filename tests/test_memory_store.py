@@ -0,0 +1,361 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+import numpy as np
+
+from thoughtful_agents.models import Memory, MemoryStore
+from thoughtful_agents.models.enums import MentalObjectType
+from thoughtful_agents.utils.embedding_matrix import normalize_embedding
+from thoughtful_agents.utils.vector_index import FAISS_AVAILABLE
+from thoughtful_agents.utils.saliency import recalibrate_all_saliency
+
+def make_memory(content, embedding, memory_type=MentalObjectType.MEMORY_LONG_TERM):
+    return Memory(
+        agent_id=0,
+        type=memory_type,
+        content=content,
+        generated_turn=0,
+        last_accessed_turn=0,
+        embedding=embedding,
+        compute_embedding=False
+    )
+
+class TestMemory(unittest.TestCase):
+    def test_slots(self):
+        """Test that memories do not carry a per-instance __dict__."""
+        memory = make_memory("memory", [1.0, 0.0])
+        self.assertFalse(hasattr(memory, "__dict__"))
+        with self.assertRaises(AttributeError):
+            memory.unknown_attribute = 1
+
+class TestMemoryStoreSearch(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.embeddings = rng.standard_normal((50, 16)).astype(np.float32)
+        self.store = MemoryStore(quantize=False)
+        self.memories = [make_memory(f"memory {i}", e) for i, e in enumerate(self.embeddings)]
+        for memory in self.memories:
+            self.store.add(memory)
+
+    def expected_order(self, query, memories):
+        similarities = [float(m.embedding @ query) / np.linalg.norm(query) for m in memories]
+        return [memories[i] for i in np.argsort(similarities)[::-1]]
+
+    def test_matches_brute_force(self):
+        """Test that search returns the most cosine-similar memories in order."""
+        query = self.embeddings[7] + 0.1
+        self.assertEqual(self.store.search(query, k=5), self.expected_order(query, self.memories)[:5])
+
+    def test_incremental_add_and_remove(self):
+        """Test that memories added or removed after a search are reflected in the next one."""
+        query = self.embeddings[3]
+        self.store.search(query, k=1)
+
+        extra = make_memory("extra", query * 2)
+        self.store.add(extra)
+        self.assertCountEqual(self.store.search(query, k=2), [extra, self.memories[3]])
+
+        self.store.remove(extra)
+        self.store.remove(self.memories[3])
+        remaining = [m for m in self.memories if m is not self.memories[3]]
+        self.assertEqual(self.store.search(query, k=3), self.expected_order(query, remaining)[:3])
+
+    def test_memories_without_embeddings(self):
+        """Test that memories are searchable once their embedding is computed."""
+        pending = make_memory("pending", None)
+        self.store.add(pending)
+        query = self.embeddings[0] * -1
+        self.assertNotIn(pending, self.store.search(query, k=len(self.memories) + 1))
+
+        pending.embedding = query / np.linalg.norm(query)
+        self.assertIs(self.store.search(query, k=1)[0], pending)
+
+    def test_pending_memories_do_not_rebuild(self):
+        """Test that a memory without an embedding is appended when it arrives instead of forcing rebuilds."""
+        index = self.store._get_index(MentalObjectType.MEMORY_LONG_TERM)
+        pending = make_memory("pending", None)
+        self.store.add(pending)
+        for _ in range(3):
+            self.store.search(self.embeddings[0], k=1)
+            self.store.recalibrate_saliency(SimpleNamespace(embedding=self.embeddings[0], turn_number=1))
+        self.assertIs(self.store._get_index(MentalObjectType.MEMORY_LONG_TERM), index)
+
+        pending.embedding = normalize_embedding(self.embeddings[1] + 0.01)
+        self.assertEqual(self.store.search(self.embeddings[1] + 0.01, k=1), [pending])
+        self.assertIs(self.store._get_index(MentalObjectType.MEMORY_LONG_TERM), index)
+        self.assertEqual(len(index), len(self.memories) + 1)
+
+        # Removing a memory that is still pending leaves the index as is
+        other = make_memory("other", None)
+        self.store.add(other)
+        self.store.remove(other)
+        self.assertIs(self.store._get_index(MentalObjectType.MEMORY_LONG_TERM), index)
+
+    def test_embeddings_are_matrix_rows(self):
+        """Test that indexed memories' embeddings are read-only views of the saliency matrix, including after it grows."""
+        self.store.search(self.embeddings[0], k=1)
+        for i in range(100):  # Grows the matrix past its initial capacity
+            self.store.add(make_memory(f"extra {i}", self.embeddings[i % 50] + 1.0))
+        matrix = self.store._embedding_matrices[MentalObjectType.MEMORY_LONG_TERM].view()
+        for memory in self.store.long_term_memory:
+            self.assertTrue(np.shares_memory(memory.embedding, matrix))
+            self.assertFalse(memory.embedding.flags.writeable)
+        np.testing.assert_allclose(self.memories[3].embedding, normalize_embedding(self.embeddings[3]), rtol=1e-6)
+
+    def test_memory_types(self):
+        """Test that search is limited to the given memory type unless both are requested."""
+        short_term = make_memory("short", self.embeddings[0], MentalObjectType.MEMORY_SHORT_TERM)
+        self.store.add(short_term)
+
+        self.assertEqual(self.store.search(self.embeddings[0], k=1, memory_type=MentalObjectType.MEMORY_SHORT_TERM), [short_term])
+        self.assertIs(self.store.search(self.embeddings[0], k=1)[0], self.memories[0])
+        both = self.store.search(self.embeddings[0], k=2, memory_type=MentalObjectType.THOUGHT_SYSTEM1)
+        self.assertCountEqual(both, [short_term, self.memories[0]])
+
+class TestMemoryStoreQueryCache(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(4)
+        self.embeddings = rng.standard_normal((20, 16)).astype(np.float32)
+        self.store = MemoryStore(quantize=False, use_faiss=False)
+        self.memories = [make_memory(f"memory {i}", e) for i, e in enumerate(self.embeddings)]
+        self.store.add_many(self.memories)
+
+    def test_similar_queries_reuse_results(self):
+        """Test that a near-identical query is answered from the cache without searching."""
+        results = self.store.search(self.embeddings[2], k=3)
+        index = self.store._get_index(MentalObjectType.MEMORY_LONG_TERM)
+        index.search = None  # Any search would fail
+        self.assertEqual(self.store.search(self.embeddings[2] * 1.01 + 0.001, k=3), results)
+        self.assertEqual(self.store.search(self.embeddings[2], k=2), results[:2])
+        with self.assertRaises(TypeError):
+            self.store.search(self.embeddings[2], k=4)
+        with self.assertRaises(TypeError):
+            self.store.search(self.embeddings[9], k=3)
+
+    def test_cache_invalidated_by_changes(self):
+        """Test that adding or removing memories invalidates cached results."""
+        query = self.embeddings[5] + 0.1
+        self.assertIs(self.store.search(query, k=1)[0], self.memories[5])
+
+        closer = make_memory("closer", query)
+        self.store.add(closer)
+        self.assertIs(self.store.search(query, k=1)[0], closer)
+
+        self.store.remove(closer)
+        self.assertIs(self.store.search(query, k=1)[0], self.memories[5])
+
+        self.store.long_term_memory.append(closer)
+        self.assertIs(self.store.search(query, k=1)[0], closer)
+
+    def test_cache_can_be_disabled(self):
+        """Test that a zero-size cache always searches."""
+        store = MemoryStore(quantize=False, use_faiss=False, query_cache_size=0)
+        store.add_many(self.memories)
+        store.search(self.embeddings[0], k=1)
+        self.assertEqual(len(store._query_cache), 0)
+
+class TestMemoryStoreSaliency(unittest.TestCase):
+    def test_matches_recalibrate_all_saliency(self):
+        """Test that store-level recalibration matches the per-list implementation."""
+        rng = np.random.default_rng(3)
+        store = MemoryStore()
+        memories = [make_memory(f"memory {i}", e) for i, e in enumerate(rng.standard_normal((12, 16)))]
+        for i, memory in enumerate(memories):
+            memory.weight = 0.5 + i / 12
+            memory.last_accessed_turn = i % 4
+            store.add(memory)
+        memories[0].last_accessed_turn = 10  # Accessed after the utterance, so left unchanged
+        memories[0].saliency = -1.0
+        utterance = SimpleNamespace(
+            embedding=normalize_embedding(rng.standard_normal(16)),
+            interpretation_embedding=normalize_embedding(rng.standard_normal(16)),
+            turn_number=5
+        )
+
+        store.recalibrate_saliency(utterance, decay_factor=0.9)
+        from_store = [m.saliency for m in memories]
+        recalibrate_all_saliency(memories, utterance, decay_factor=0.9)
+
+        np.testing.assert_allclose(from_store, [m.saliency for m in memories], rtol=1e-5)
+        self.assertEqual(memories[0].saliency, -1.0)
+
+class TestPersistentMemoryStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.embeddings = np.random.default_rng(6).standard_normal((10, 16)).astype(np.float32)
+
+    def test_save_and_load(self):
+        """Test that saved long-term memories are reopened with memory-mapped embeddings."""
+        store = MemoryStore(quantize=False, use_faiss=False, persist_path=self.tmp_dir.name)
+        memories = [make_memory(f"memory {i}", e) for i, e in enumerate(self.embeddings)]
+        store.add_many(memories[:4])
+        self.assertEqual(store.search(self.embeddings[1], k=1), [memories[1]])
+        store.add_many(memories[4:])  # Appended to the file, which grows past its first capacity
+        memories[2].weight = 0.5
+        store.save()
+
+        loaded = MemoryStore.load(self.tmp_dir.name, quantize=False, use_faiss=False)
+        self.assertEqual([m.content for m in loaded.long_term_memory], [m.content for m in memories])
+        self.assertEqual([m.id for m in loaded.long_term_memory], [m.id for m in memories])
+        self.assertEqual(loaded.long_term_memory[2].weight, 0.5)
+        for original, reopened in zip(memories, loaded.long_term_memory):
+            np.testing.assert_allclose(reopened.embedding, original.embedding, rtol=1e-6)
+            self.assertFalse(reopened.embedding.flags.writeable)
+        self.assertIs(loaded.search(self.embeddings[7], k=1)[0], loaded.long_term_memory[7])
+
+    def test_grow_after_remove(self):
+        """Test that the file can grow past its capacity while it has unused rows, before and after a load."""
+        rng = np.random.default_rng(7)
+        store = MemoryStore(persist_path=self.tmp_dir.name)
+        store.add_many([make_memory(f"memory {i}", e) for i, e in enumerate(self.embeddings[:3])])
+        store.search(self.embeddings[0], k=1)
+        store.remove(store.long_term_memory[1])
+        matrix = store._embedding_matrices[MentalObjectType.MEMORY_LONG_TERM]
+        capacity = matrix.capacity
+        for i in range(capacity):
+            store.add(make_memory(f"extra {i}", rng.standard_normal(16)))
+        self.assertGreater(matrix.capacity, capacity)
+        self.assertIs(store.search(self.embeddings[2], k=1)[0], store.long_term_memory[1])
+        store.save()
+
+        loaded = MemoryStore.load(self.tmp_dir.name)
+        matrix = loaded._embedding_matrices[MentalObjectType.MEMORY_LONG_TERM]
+        capacity = matrix.capacity
+        for i in range(capacity):
+            loaded.add(make_memory(f"more {i}", rng.standard_normal(16)))
+        self.assertGreater(matrix.capacity, capacity)
+        self.assertEqual(loaded.search(self.embeddings[2], k=1)[0].content, "memory 2")
+        view = matrix.view()
+        for memory in loaded.long_term_memory:
+            self.assertTrue(np.shares_memory(memory.embedding, view))
+
+    def test_long_term_search_scans_the_file(self):
+        """Test that long-term memories are searched from the memory-mapped file, without an in-memory index copy."""
+        store = MemoryStore(persist_path=self.tmp_dir.name)  # Default quantize and faiss settings
+        store.add_many([make_memory(f"memory {i}", e) for i, e in enumerate(self.embeddings)])
+        index = store._get_index(MentalObjectType.MEMORY_LONG_TERM)
+        matrix = store._embedding_matrices[MentalObjectType.MEMORY_LONG_TERM]
+        self.assertFalse(index.use_faiss)
+        self.assertIs(index.matrix, matrix)
+        self.assertIsInstance(matrix.view(), np.memmap)
+
+        # Direct list edits are reconciled by appending rows
+        store.long_term_memory.append(make_memory("direct", -self.embeddings[0]))
+        self.assertEqual(store.search(-self.embeddings[0], k=1)[0].content, "direct")
+        self.assertEqual(len(matrix), len(self.embeddings) + 1)
+        store.recalibrate_saliency(SimpleNamespace(embedding=normalize_embedding(self.embeddings[3]), turn_number=0))
+        self.assertAlmostEqual(store.long_term_memory[3].saliency, 1.0, places=5)
+
+    def test_remove_and_pending_embeddings(self):
+        """Test that removals and memories without embeddings survive a save and load."""
+        store = MemoryStore(quantize=False, use_faiss=False, persist_path=self.tmp_dir.name)
+        memories = [make_memory(f"memory {i}", e) for i, e in enumerate(self.embeddings[:3])]
+        store.add_many(memories)
+        store.search(self.embeddings[0], k=1)
+        path = os.path.join(self.tmp_dir.name, "long_term_embeddings.f32")
+        inode = os.stat(path).st_ino
+        store.remove(memories[0])
+        self.assertEqual(store.search(self.embeddings[0], k=3), store.search(self.embeddings[0], k=2))
+        self.assertNotIn(memories[0], store.search(self.embeddings[0], k=3))
+        store.add(make_memory("pending", None))
+        store.save()
+        self.assertEqual(os.stat(path).st_ino, inode)  # Rows are only appended, never rewritten
+
+        loaded = MemoryStore.load(self.tmp_dir.name, quantize=False, use_faiss=False)
+        self.assertEqual([m.content for m in loaded.long_term_memory], ["memory 1", "memory 2", "pending"])
+        self.assertIsNone(loaded.long_term_memory[2].embedding)
+        self.assertIs(loaded.search(self.embeddings[2], k=1)[0], loaded.long_term_memory[1])
+        loaded.recalibrate_saliency(SimpleNamespace(embedding=normalize_embedding(self.embeddings[2]), turn_number=0))
+        self.assertAlmostEqual(loaded.long_term_memory[1].saliency, 1.0, places=5)
+
+        # Removing everything leaves an empty store that can be saved, loaded and added to
+        for memory in list(loaded.long_term_memory):
+            loaded.remove(memory)
+        loaded.save()
+        empty = MemoryStore.load(self.tmp_dir.name, quantize=False, use_faiss=False)
+        self.assertEqual(empty.long_term_memory, [])
+        empty.add(make_memory("new", self.embeddings[0]))
+        self.assertEqual(len(empty.search(self.embeddings[0], k=1)), 1)
+
+    def test_save_requires_persist_path(self):
+        """Test that saving a store without a persist_path raises an error."""
+        with self.assertRaises(ValueError):
+            MemoryStore().save()
+
+class TestMemoryStoreRetrieval(unittest.TestCase):
+    def test_retrieve_top_k(self):
+        """Test that the most salient memories above the threshold are returned in order."""
+        store = MemoryStore()
+        memories = [make_memory(f"memory {i}", [1.0, float(i)]) for i in range(5)]
+        for memory, saliency in zip(memories, [0.1, 0.9, 0.5, 0.9, 0.3]):
+            memory.saliency = saliency
+        store.add_many(memories)
+        short_term = make_memory("short", [0.0, 1.0], MentalObjectType.MEMORY_SHORT_TERM)
+        short_term.saliency = 1.0
+        store.add(short_term)
+
+        self.assertEqual(store.retrieve_top_k(3), [memories[1], memories[3], memories[2]])
+        self.assertEqual(store.retrieve_top_k(10, threshold=0.5), [memories[1], memories[3], memories[2]])
+        self.assertEqual(store.retrieve_top_k(2, memory_type=MentalObjectType.THOUGHT_SYSTEM1), [short_term, memories[1]])
+        self.assertEqual(store.retrieve_top_k(3, threshold=2.0), [])
+
+class TestMemoryStoreStorage(unittest.TestCase):
+    def test_default_index_storage(self):
+        """Test that by default the NumPy backend searches the float32 matrix and faiss stores 8-bit vectors."""
+        embeddings = np.random.default_rng(8).standard_normal((70, 16)).astype(np.float32)
+        backends = [False, True] if FAISS_AVAILABLE else [False]
+        for use_faiss in backends:
+            store = MemoryStore(use_faiss=use_faiss)
+            store.add_many([make_memory(f"memory {i}", e) for i, e in enumerate(embeddings[:10])])
+            store.search(embeddings[0], k=1)
+            store.add_many([make_memory(f"extra {i}", e) for i, e in enumerate(embeddings[10:])])
+            index = store._get_index(MentalObjectType.MEMORY_LONG_TERM)
+            matrix = store._embedding_matrices[MentalObjectType.MEMORY_LONG_TERM]
+            self.assertEqual(len(matrix), 70)
+            if use_faiss:
+                self.assertTrue(index.quantize)
+            else:
+                self.assertIs(index.matrix, matrix)
+            self.assertEqual(store.search(embeddings[42], k=1)[0].content, "extra 32")
+
+class TestQuantizedMemoryStore(unittest.TestCase):
+    def test_quantized_search(self):
+        """Test that int8 search matrices find the same nearest memory as float32 ones."""
+        rng = np.random.default_rng(1)
+        embeddings = rng.standard_normal((30, 64)).astype(np.float32)
+        quantized, exact = MemoryStore(quantize=True, use_faiss=False), MemoryStore(quantize=False, use_faiss=False)
+        memories = [make_memory(f"memory {i}", e) for i, e in enumerate(embeddings)]
+        for memory in memories:
+            quantized.add(memory)
+            exact.add(memory)
+
+        for i in (0, 10, 20):
+            query = embeddings[i] + 0.05 * rng.standard_normal(64).astype(np.float32)
+            self.assertIs(quantized.search(query, k=1)[0], memories[i])
+            self.assertEqual(quantized.search(query, k=1), exact.search(query, k=1))
+
+@unittest.skipUnless(FAISS_AVAILABLE, "faiss is not installed")
+class TestFaissMemoryStore(unittest.TestCase):
+    def test_faiss_matches_numpy(self):
+        """Test that faiss-backed search, including after the switch to HNSW, matches NumPy search."""
+        rng = np.random.default_rng(2)
+        embeddings = rng.standard_normal((40, 32)).astype(np.float32)
+        faiss_store, numpy_store = MemoryStore(use_faiss=True), MemoryStore(quantize=False, use_faiss=False)
+        memories = [make_memory(f"memory {i}", e) for i, e in enumerate(embeddings)]
+        for memory in memories:
+            faiss_store.add(memory)
+            numpy_store.add(memory)
+
+        query = embeddings[5]
+        self.assertEqual(faiss_store.search(query, k=3), numpy_store.search(query, k=3))
+
+        faiss_store._get_index(MentalObjectType.MEMORY_LONG_TERM).hnsw_threshold = len(memories) + 1
+        extra = make_memory("extra", -query)
+        faiss_store.add(extra)
+        numpy_store.add(extra)
+        self.assertEqual(faiss_store.search(-query, k=1), [extra])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from types import SimpleNamespace
+import numpy as np
+
+from thoughtful_agents.utils import scoring
+from thoughtful_agents.utils.saliency import compute_saliency, recalibrate_all_saliency
+
+class TestSaliencyScores(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.embeddings = rng.standard_normal((20, 16)).astype(np.float32)
+        self.weights = rng.uniform(0.5, 1.5, 20).astype(np.float32)
+        self.last_accessed = rng.integers(0, 5, 20)
+        self.interpretation = rng.standard_normal(16).astype(np.float32)
+        self.text = rng.standard_normal(16).astype(np.float32)
+
+    def test_matches_compute_saliency(self):
+        """Test that vectorized scores match the per-item saliency formula."""
+        scores = scoring.saliency_scores(
+            self.embeddings, self.interpretation, self.text, self.weights,
+            self.last_accessed, current_turn=5, decay_factor=0.9
+        )
+        utterance = SimpleNamespace(
+            embedding=self.text, interpretation="x", interpretation_embedding=self.interpretation, turn_number=5
+        )
+        for i, score in enumerate(scores):
+            item = SimpleNamespace(embedding=self.embeddings[i], weight=self.weights[i], last_accessed_turn=self.last_accessed[i])
+            self.assertAlmostEqual(float(score), compute_saliency(item, utterance, decay_factor=0.9), places=4)
+
+    def test_numpy_fallback_matches(self):
+        """Test that the NumPy fallback gives the same scores as the default path."""
+        args = (self.embeddings, self.interpretation, self.text, self.weights, self.last_accessed.astype(np.int64), 5, 0.9, 1.0, 1.0)
+        np.testing.assert_allclose(scoring._saliency_numpy(*args), scoring.saliency_scores(*args), rtol=1e-4, atol=1e-5)
+
+    def test_normalized_rows(self):
+        """Test that skipping row norms for unit-length rows gives the same scores in both paths."""
+        unit = self.embeddings / np.linalg.norm(self.embeddings, axis=1, keepdims=True)
+        args = (unit, self.interpretation, self.text, self.weights, self.last_accessed.astype(np.int64), 5, 0.9, 1.0, 1.0)
+        expected = scoring._saliency_numpy(*args)
+        np.testing.assert_allclose(scoring._saliency_numpy(*args, normalized=True), expected, rtol=1e-4, atol=1e-5)
+        np.testing.assert_allclose(scoring.saliency_scores(*args, normalized=True), expected, rtol=1e-4, atol=1e-5)
+
+    def test_recalibrate_skips_future_items(self):
+        """Test that items accessed after the utterance keep their saliency."""
+        utterance = SimpleNamespace(embedding=self.text, interpretation_embedding=None, turn_number=1)
+        items = [
+            SimpleNamespace(embedding=self.embeddings[0], weight=1.0, last_accessed_turn=0, saliency=0.0),
+            SimpleNamespace(embedding=self.embeddings[1], weight=1.0, last_accessed_turn=3, saliency=-1.0),
+        ]
+        recalibrate_all_saliency(items, utterance)
+
+        self.assertNotEqual(items[0].saliency, 0.0)
+        self.assertEqual(items[1].saliency, -1.0)
+
+    @unittest.skipUnless(scoring.NUMBA_AVAILABLE, "numba is not installed")
+    def test_numba_kernel_compiled_once(self):
+        """Test that scoring calls reuse the kernel specialization compiled at import."""
+        signatures = list(scoring._saliency_numba.signatures)
+        scoring.saliency_scores(
+            self.embeddings, self.interpretation, self.text, self.weights.astype(np.float64),
+            self.last_accessed.astype(np.int32), current_turn=np.int32(5), decay_factor=1, normalized=False
+        )
+        self.assertEqual(scoring._saliency_numba.signatures, signatures)
+
+class TestTopkIndices(unittest.TestCase):
+    def test_threshold_and_order(self):
+        """Test that topk_indices filters by threshold and sorts descending."""
+        scores = np.array([0.1, 0.9, 0.5, 0.9, 0.2], dtype=np.float32)
+        indices, top = scoring.topk_indices(scores, k=3, threshold=0.3)
+        self.assertEqual(list(indices), [1, 3, 2])
+        np.testing.assert_allclose(top, [0.9, 0.9, 0.5])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+
+from thoughtful_agents.utils.semantic_cache import ExactEmbedCache, SemanticInterpCache
+
+class TestExactEmbedCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        """Test that the least recently used embedding is evicted first."""
+        cache = ExactEmbedCache(capacity=2)
+        cache.put("a", "model", [1.0])
+        cache.put("b", "model", [2.0])
+        cache.get("a", "model")
+        cache.put("c", "model", [3.0])
+
+        self.assertEqual(cache.get("a", "model"), [1.0])
+        self.assertIsNone(cache.get("b", "model"))
+        self.assertEqual(cache.get("c", "model"), [3.0])
+
+    def test_model_is_part_of_key(self):
+        """Test that embeddings from different models do not collide."""
+        cache = ExactEmbedCache()
+        cache.put("a", "small", [1.0])
+        self.assertIsNone(cache.get("a", "large"))
+
+    def test_disk_tier(self):
+        """Test that embeddings persist on disk and the oldest files are evicted past the size limit."""
+        with tempfile.TemporaryDirectory() as disk_dir:
+            cache = ExactEmbedCache(disk_dir=disk_dir)
+            cache.put("a", "model", np.array([1.0, 2.0], dtype=np.float32))
+
+            restarted = ExactEmbedCache(disk_dir=disk_dir)
+            np.testing.assert_array_equal(restarted.get("a", "model"), [1.0, 2.0])
+            self.assertIsNone(restarted.get("b", "model"))
+
+            file_size = os.path.getsize(os.path.join(disk_dir, os.listdir(disk_dir)[0]))
+            small = ExactEmbedCache(disk_dir=disk_dir, max_disk_bytes=2 * file_size)
+            os.utime(os.path.join(disk_dir, os.listdir(disk_dir)[0]), (0, 0))
+            small.put("b", "model", np.array([3.0, 4.0], dtype=np.float32))
+            small.put("c", "model", np.array([5.0, 6.0], dtype=np.float32))
+
+            self.assertEqual(len(os.listdir(disk_dir)), 1)
+            self.assertIsNone(ExactEmbedCache(disk_dir=disk_dir).get("a", "model"))
+
+class TestSemanticInterpCache(unittest.TestCase):
+    def test_similar_embedding_hits(self):
+        """Test that a near-identical embedding returns the cached interpretation."""
+        rng = np.random.default_rng(1)
+        embedding = rng.standard_normal(64).astype(np.float32)
+        cache = SemanticInterpCache()
+        cache.put(embedding, "greeting")
+
+        self.assertEqual(cache.get(embedding * 2.0), "greeting")
+        self.assertIsNone(cache.get(rng.standard_normal(64).astype(np.float32)))
+
+    def test_context_must_match(self):
+        """Test that interpretations are only reused for the same context."""
+        embedding = np.random.default_rng(3).standard_normal(64).astype(np.float32)
+        cache = SemanticInterpCache()
+        cache.put(embedding, "Alice is agreeing.", context="Alice\nhistory")
+
+        self.assertEqual(cache.get(embedding, context="Alice\nhistory"), "Alice is agreeing.")
+        self.assertIsNone(cache.get(embedding, context="Bob\nhistory"))
+        self.assertIsNone(cache.get(embedding, context="Alice\nother history"))
+
+    def test_capacity(self):
+        """Test that the oldest entry is evicted when the cache is full."""
+        rng = np.random.default_rng(2)
+        embeddings = [rng.standard_normal(32).astype(np.float32) for _ in range(3)]
+        cache = SemanticInterpCache(capacity=2)
+        for i, embedding in enumerate(embeddings):
+            cache.put(embedding, str(i))
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(embeddings[0]))
+        self.assertEqual(cache.get(embeddings[2]), "2")
+
+if __name__ == "__main__":
+    unittest.main()
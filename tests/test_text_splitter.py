@@ -0,0 +1,48 @@
+import unittest
+
+from thoughtful_agents.utils.text_splitter import SentenceSplitter
+
+class TestSentenceSplitter(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.splitter = SentenceSplitter()
+
+    def test_split_paragraphs(self):
+        """Test that blank lines, including ones containing whitespace, separate paragraphs."""
+        text = "First paragraph.\n\nSecond paragraph.\n  \n\nThird paragraph.\n\n"
+        self.assertEqual(
+            self.splitter.split_paragraphs(text),
+            ["First paragraph.", "Second paragraph.", "Third paragraph."]
+        )
+
+    def test_split_text(self):
+        """Test that splitting by paragraphs and without gives the same sentences for simple text."""
+        text = "I like cats. Do you?\n\nI have two dogs!"
+        expected = ["I like cats.", "Do you?", "I have two dogs!"]
+        self.assertEqual(self.splitter.split_text(text, by_paragraphs=True), expected)
+        self.assertEqual(self.splitter.split_text(text, by_paragraphs=False), expected)
+        self.assertEqual(self.splitter.split_text(""), [])
+
+    def test_no_empty_sentences(self):
+        """Test that whitespace between sentences does not produce empty chunks."""
+        self.assertEqual(self.splitter.split_sentences("Hello. \n\n "), ["Hello."])
+        self.assertEqual(self.splitter.split_sentences("  \n "), [])
+        self.assertEqual(self.splitter.split_text("Hello. \n\n World."), ["Hello.", "World."])
+
+    def test_text_without_punctuation_skips_spacy(self):
+        """Test that text without sentence punctuation is returned as one sentence without running spaCy."""
+        text = "  a note without punctuation\nspanning two lines  "
+        self.assertEqual(self.splitter.split_sentences(text), [text.strip()])
+
+        splitter = SentenceSplitter()
+        nlp = splitter.nlp
+        splitter.nlp = None  # Any spaCy call would fail
+        self.assertEqual(splitter.split_sentences(text), [text.strip()])
+        splitter.nlp = nlp
+        self.assertEqual(
+            splitter.split_text("Plain heading\n\nA sentence. Another one.\n\nplain footer"),
+            ["Plain heading", "A sentence.", "Another one.", "plain footer"]
+        )
+
+if __name__ == "__main__":
+    unittest.main()
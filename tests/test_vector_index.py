@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+
+from thoughtful_agents.utils.vector_index import VectorIndex, FAISS_AVAILABLE
+
+class TestVectorIndex(unittest.TestCase):
+    def _check_backend(self, **kwargs):
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((50, 16)).astype(np.float32)
+        index = VectorIndex(**kwargs)
+        for vector in vectors:
+            index.add(vector * 3.0)  # scale should not matter for cosine
+
+        indices, scores = index.search(vectors[7], k=3)
+        self.assertEqual(int(indices[0]), 7)
+        self.assertAlmostEqual(float(scores[0]), 1.0, places=2)
+        self.assertTrue(np.all(np.diff(scores) <= 1e-6))
+
+    def test_numpy_backend(self):
+        """Test cosine search with the NumPy backend."""
+        self._check_backend(use_faiss=False)
+
+    def test_numpy_backend_quantized(self):
+        """Test cosine search with int8 storage."""
+        self._check_backend(use_faiss=False, quantize=True)
+
+    @unittest.skipUnless(FAISS_AVAILABLE, "faiss not installed")
+    def test_faiss_backend(self):
+        """Test cosine search with faiss, including the switch to HNSW."""
+        self._check_backend(use_faiss=True)
+        self._check_backend(use_faiss=True, hnsw_threshold=20)
+
+    @unittest.skipUnless(FAISS_AVAILABLE, "faiss not installed")
+    def test_faiss_backend_quantized(self):
+        """Test that quantized faiss indexes store one byte per component, before and after the switch to HNSW."""
+        import faiss
+
+        self._check_backend(use_faiss=True, quantize=True)
+        self._check_backend(use_faiss=True, quantize=True, hnsw_threshold=20)
+
+        index = VectorIndex(use_faiss=True, quantize=True, hnsw_threshold=20)
+        vectors = np.random.default_rng(2).standard_normal((20, 16)).astype(np.float32)
+        index.add_many(vectors[:10])
+        self.assertIsInstance(index._index, faiss.IndexScalarQuantizer)
+        self.assertEqual(index._index.code_size, 16)
+        index.add_many(vectors[10:])
+        storage = faiss.downcast_index(index._index.storage)
+        self.assertIsInstance(storage, faiss.IndexScalarQuantizer)
+        self.assertEqual(storage.code_size, 16)
+
+    def test_add_many_matches_add(self):
+        """Test that batch insertion gives the same results as adding one at a time."""
+        rng = np.random.default_rng(1)
+        vectors = rng.standard_normal((30, 8)).astype(np.float32)
+        backends = [dict(use_faiss=False), dict(use_faiss=False, quantize=True)]
+        if FAISS_AVAILABLE:
+            backends += [dict(use_faiss=True), dict(use_faiss=True, hnsw_threshold=20),
+                         dict(use_faiss=True, quantize=True), dict(use_faiss=True, quantize=True, hnsw_threshold=20)]
+        for kwargs in backends:
+            one_by_one, batched = VectorIndex(**kwargs), VectorIndex(**kwargs)
+            for vector in vectors:
+                one_by_one.add(vector)
+            batched.add_many(vectors[:10])
+            batched.add_many(vectors[10:])
+
+            self.assertEqual(len(batched), 30)
+            for i in (0, 15, 29):
+                np.testing.assert_array_equal(batched.search(vectors[i], k=5)[0], one_by_one.search(vectors[i], k=5)[0])
+
+    def test_empty(self):
+        """Test that an empty index returns no results."""
+        indices, _ = VectorIndex(use_faiss=False).search([1.0, 0.0], k=5)
+        self.assertEqual(len(indices), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,17 +1,77 @@
-from typing import List, Dict, Optional, Union, TYPE_CHECKING
+from typing import List, Dict, Optional, Set, Union, TYPE_CHECKING
 import numpy as np
 from numpy.typing import NDArray
-import uuid
+from collections import deque
+import itertools
 import asyncio
+import re
 
 from thoughtful_agents.models.enums import EventType
-from thoughtful_agents.utils.llm_api import get_completion, get_embedding_sync, get_embedding_async
+from thoughtful_agents.utils.llm_api import get_completion, get_embedding_sync, embedding_batcher
+from thoughtful_agents.utils.semantic_cache import interpretation_cache
+from thoughtful_agents.utils.vector_index import VectorIndex
+from thoughtful_agents.utils.embedding_matrix import normalize_embedding
 
 # Use TYPE_CHECKING to avoid circular imports
 if TYPE_CHECKING:
     from thoughtful_agents.models.participant import Participant
 
+# Utterances that carry no content worth interpreting with the LLM
+_TRIVIAL_SET = frozenset({
+    "ok", "okay", "k", "yes", "yep", "yeah", "no", "nope", "sure", "right",
+    "thanks", "thank you", "thx", "hi", "hello", "hey", "bye", "hmm", "mhm", "uh huh",
+    "cool", "nice", "great", "lol"
+})
+# Empty, whitespace-only, or punctuation/emoji-only utterances
+_ACK_RE = re.compile(r"^[\s\W]*$")
+# Utterances with fewer words than this are not interpreted
+MIN_INTERPRETATION_WORDS = 3
+
+def is_trivial_utterance(content: str) -> bool:
+    """Check whether an utterance is too short or generic to need an LLM interpretation.
+
+    Args:
+        content: The utterance text
+
+    Returns:
+        True if the utterance is empty, an acknowledgement, or shorter than MIN_INTERPRETATION_WORDS
+    """
+    if _ACK_RE.match(content):
+        return True
+    normalized = content.strip().lower().rstrip(".!?,")
+    return normalized in _TRIVIAL_SET or len(normalized.split()) < MIN_INTERPRETATION_WORDS
+
 class Event:
+    """An event (e.g. an utterance) in a conversation.
+    
+    By default, construction never calls the embedding API. Embeddings that are
+    not passed in are computed with compute_embedding_async / compute_all_embeddings,
+    so concurrent events can share a batched request. Pass compute_embedding=True
+    to compute them synchronously in the constructor instead (blocking).
+    
+    Embeddings are L2-normalized when set, so cosine similarity between them is
+    a plain dot product.
+    """
+    
+    # Source of event IDs; next() on itertools.count is atomic in CPython
+    _next_id = itertools.count()
+    
+    __slots__ = (
+        "id",
+        "participant_id",
+        "type",
+        "content",
+        "turn_number",
+        "participant_name",
+        "thought_id",
+        "interpretation",
+        "pred_next_turn",
+        "embedding",
+        "interpretation_embedding",
+        "emb_idx",
+        "interpretation_emb_idx",
+        "interpretation_task",
+    )
     
     def __init__(
         self,
@@ -25,10 +85,10 @@ class Event:
         pred_next_turn: str = "",
         embedding: Optional[Union[NDArray[np.float32], List[float]]] = None,
         interpretation_embedding: Optional[Union[NDArray[np.float32], List[float]]] = None,
-        compute_embedding: bool = True
+        compute_embedding: bool = False
     ):
-        # Always generate a UUID
-        self.id = str(uuid.uuid4())
+        # IDs are unique, increasing integers within the process
+        self.id: int = next(Event._next_id)
             
         # Simple attributes that don't need validation
         self.participant_id = participant_id
@@ -40,87 +100,135 @@ class Event:
         self.interpretation = interpretation
         self.pred_next_turn = pred_next_turn
         
-        # Handle content embedding computation
-        if embedding is not None:
-            # Convert list to numpy array if needed
-            if isinstance(embedding, list):
-                self.embedding = np.array(embedding, dtype=np.float32)
-            else:
-                self.embedding = embedding
-        elif compute_embedding:
-            # Compute embedding synchronously
-            self.embedding = self._compute_embedding_sync(content)
-        else:
-            # Defer embedding computation
-            self.embedding = None
-            
-        # Handle interpretation embedding computation
-        if interpretation_embedding is not None:
-            # Convert list to numpy array if needed
-            if isinstance(interpretation_embedding, list):
-                self.interpretation_embedding = np.array(interpretation_embedding, dtype=np.float32)
-            else:
-                self.interpretation_embedding = interpretation_embedding
-        elif compute_embedding and interpretation:
-            # Compute embedding synchronously
-            self.interpretation_embedding = self._compute_embedding_sync(interpretation)
-        else:
-            # Defer embedding computation
-            self.interpretation_embedding = None
-    
-    def _compute_embedding_sync(self, text: str) -> NDArray[np.float32]:
-        """Compute embedding synchronously (blocking call).
+        # Row indices into the conversation's embedding matrices, set once indexed
+        self.emb_idx: Optional[int] = None
+        self.interpretation_emb_idx: Optional[int] = None
         
-        This is a helper method for the constructor. For async code,
-        use compute_embedding_async instead.
-        """
-        # Use the synchronous version of get_embedding
-        embedding_list = get_embedding_sync(text)
-        return np.array(embedding_list, dtype=np.float32)
+        # Pending interpretation, set by Conversation.schedule_interpretation
+        self.interpretation_task: Optional[asyncio.Task] = None
+        
+        # Use the given embeddings; anything missing is computed later unless requested now
+        if embedding is None and compute_embedding:
+            embedding = get_embedding_sync(content)
+        if interpretation_embedding is None and compute_embedding and interpretation:
+            interpretation_embedding = get_embedding_sync(interpretation)
+        self.embedding = normalize_embedding(embedding) if embedding is not None else None
+        self.interpretation_embedding = (
+            normalize_embedding(interpretation_embedding) if interpretation_embedding is not None else None
+        )
     
     async def compute_embedding_async(self) -> None:
-        """Compute embedding asynchronously if it wasn't computed in the constructor."""
+        """Compute embedding asynchronously if it wasn't passed to the constructor."""
         if self.embedding is None:
-            embedding_list = await get_embedding_async(self.content)
-            self.embedding = np.array(embedding_list, dtype=np.float32)
+            embedding = await embedding_batcher.embed(self.content)
+            self.embedding = normalize_embedding(embedding)
     
     async def compute_interpretation_embedding_async(self) -> None:
-        """Compute interpretation embedding asynchronously if it wasn't computed in the constructor."""
+        """Compute interpretation embedding asynchronously if it wasn't passed to the constructor."""
         if self.interpretation and self.interpretation_embedding is None:
-            embedding_list = await get_embedding_async(self.interpretation)
-            self.interpretation_embedding = np.array(embedding_list, dtype=np.float32)
+            embedding = await embedding_batcher.embed(self.interpretation)
+            self.interpretation_embedding = normalize_embedding(embedding)
+    
+    async def compute_all_embeddings(self) -> None:
+        """Compute the content and interpretation embeddings concurrently, skipping any already computed."""
+        await asyncio.gather(
+            self.compute_embedding_async(),
+            self.compute_interpretation_embedding_async()
+        )
+    
+    async def wait_for_interpretation(self) -> str:
+        """Wait for a scheduled interpretation, if any, to finish.
+        
+        Returns:
+            The interpretation text
+        """
+        if self.interpretation_task is not None:
+            await self.interpretation_task
+        return self.interpretation
     
     def has_interpretation(self) -> bool:
         """Check if this event has an interpretation."""
         return bool(self.interpretation)
 
 class Conversation:
+    # Number of recent events kept pre-rendered for prompt history
+    FORMATTED_TAIL_SIZE = 20
+    
     def __init__(self, context: str):
         self.context = context
         self.participants: List['Participant'] = []
         self.event_history: List[Event] = []
         self.turn_number = 0
+        
+        # Rolling buffer of (event ID, "name: content\n") lines for the most recent
+        # events, so prompts don't re-render the history on every call
+        self._formatted_tail: deque = deque(maxlen=self.FORMATTED_TAIL_SIZE)
+        
+        # Indexes for O(1) lookup by ID
+        self._events_by_id: Dict[int, Event] = {}
+        self._participants_by_id: Dict[str, 'Participant'] = {}
+        # Agent participants, kept in join order so broadcasts don't re-filter by type
+        self._agents: List['Participant'] = []
+        
+        # Interpretations running in the background (also keeps the tasks referenced)
+        self._pending_interpretations: Set[asyncio.Task] = set()
+        
+        # Similarity search indexes (faiss if installed, otherwise int8-quantized
+        # NumPy matrices), with the event stored at each row
+        self._embeddings = VectorIndex(quantize=True)
+        self._embedding_events: List[Event] = []
+        self._interp_embeddings = VectorIndex(quantize=True)
+        self._interp_embedding_events: List[Event] = []
 
     def add_participant(self, participant: 'Participant') -> None:
         """Add a participant to the conversation."""
+        # Import Agent here to avoid circular imports
+        from thoughtful_agents.models.participant import Agent
+        
         self.participants.append(participant)
+        self._participants_by_id[participant.id] = participant
+        if isinstance(participant, Agent):
+            self._agents.append(participant)
     
     def remove_participant(self, participant: 'Participant') -> None:
         """Remove a participant from the conversation."""
         self.participants.remove(participant)
+        if self._participants_by_id.get(participant.id) is participant:
+            del self._participants_by_id[participant.id]
+        if participant in self._agents:
+            self._agents.remove(participant)
     
 
     def record_event(self, event: Event) -> None:
         """Record an event in the conversation history."""
-        # Set the participant_name if it's still the default "Unknown"
+        # Set the participant_name once at ingest (O(1) via the ID index) so prompt
+        # building never has to look the speaker up again
         if event.participant_name == "Unknown":
-            for participant in self.participants:
-                if participant.id == event.participant_id:
-                    event.participant_name = participant.name
-                    break
+            participant = self._participants_by_id.get(event.participant_id)
+            if participant is not None:
+                event.participant_name = participant.name
         
         self.event_history.append(event)
+        self._events_by_id[event.id] = event
+        self._formatted_tail.append((event.id, f"{event.participant_name}: {event.content}\n"))
         self.turn_number += 1
+        self.index_event_embeddings(event)
+    
+    def index_event_embeddings(self, event: Event) -> None:
+        """Add any computed embeddings of an event to the conversation's embedding matrices.
+        
+        Events are indexed at most once; call this again after computing embeddings
+        that were deferred when the event was recorded.
+        
+        Args:
+            event: The event to index
+        """
+        if event.embedding is not None and event.emb_idx is None:
+            event.emb_idx = self._embeddings.add(event.embedding)
+            self._embedding_events.append(event)
+        if event.interpretation_embedding is not None and event.interpretation_emb_idx is None:
+            event.interpretation_emb_idx = self._interp_embeddings.add(event.interpretation_embedding)
+            self._interp_embedding_events.append(event)
 
     
     async def interpret_event(self, event: Event) -> str:
@@ -137,12 +245,7 @@ class Conversation:
             return ""
             
         # Retrieve recent conversation history
-        last_events = self.get_last_n_events(5)
-        conversation_history = ""
-        for e in last_events:
-            if e.id == event.id:
-                break  # Stop when we reach the current event
-            conversation_history += f"{e.participant_name}: {e.content}\n"
+        conversation_history = self.get_conversation_history(5, until_event=event)
             
         # Create the prompt
         system_prompt = "You are an assistant that interprets the meaning and intent behind utterances in a conversation. Provide a brief interpretation that captures the key points, emotional tone, and implicit meaning."
@@ -150,20 +253,36 @@ class Conversation:
         
         # Call the OpenAI API
         try:
-            response = await get_completion(
-                system_prompt=system_prompt,
-                user_prompt=user_prompt,
-                temperature=0.7,
-            )
+            await event.compute_embedding_async()
             
-            # Extract the interpretation from the response
-            interpretation = response.get("text", "").strip()
+            if is_trivial_utterance(event.content):
+                # Trivial utterances are their own interpretation; no LLM call needed
+                interpretation = event.content
+                event.interpretation_embedding = event.embedding
+            else:
+                # Reuse the interpretation of a near-identical utterance if one is cached
+                # for the same speaker and history, since the prompt depends on both
+                cache_context = f"{event.participant_name}\n{conversation_history}"
+                interpretation = interpretation_cache.get(event.embedding, cache_context)
+            
+            if interpretation is None:
+                response = await get_completion(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    temperature=0.7,
+                )
+                
+                # Extract the interpretation from the response
+                interpretation = response.get("text", "").strip()
+                if interpretation:
+                    interpretation_cache.put(event.embedding, interpretation, cache_context)
             
             # Update the event with the interpretation
             event.interpretation = interpretation
             
             # Compute the interpretation embedding asynchronously
             await self.compute_interpretation_embedding(event)
+            self.index_event_embeddings(event)
             
             return interpretation
             
@@ -172,6 +291,35 @@ class Conversation:
             print(f"Error interpreting event: {str(e)}")
             return ""
             
+    def schedule_interpretation(self, event: Event) -> asyncio.Task:
+        """Start interpreting an event in the background.
+        
+        The task is stored on event.interpretation_task; await
+        event.wait_for_interpretation() where the interpretation is needed.
+        Must be called from a running event loop.
+        
+        Args:
+            event: The event to interpret
+            
+        Returns:
+            The interpretation task
+        """
+        if event.interpretation_task is None:
+            task = asyncio.create_task(self.interpret_event(event))
+            event.interpretation_task = task
+            self._pending_interpretations.add(task)
+            task.add_done_callback(self._pending_interpretations.discard)
+        return event.interpretation_task
+    
+    async def wait_for_interpretations(self) -> None:
+        """Wait for all background interpretations to finish, e.g. before shutting down."""
+        if not self._pending_interpretations:
+            return
+        results = await asyncio.gather(*self._pending_interpretations, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Error interpreting event: {str(result)}")
+    
     async def compute_interpretation_embedding(self, event: Event) -> None:
         """Compute the embedding for an event's interpretation.
         
@@ -180,14 +328,14 @@ class Conversation:
         """
         if event.interpretation and event.interpretation_embedding is None:
             try:
-                embedding_list = await get_embedding_async(event.interpretation)
-                event.interpretation_embedding = np.array(embedding_list, dtype=np.float32)
+                embedding = await embedding_batcher.embed(event.interpretation)
+                event.interpretation_embedding = normalize_embedding(embedding)
             except Exception as e:
                 # Log the error
                 print(f"Error computing interpretation embedding: {str(e)}")
     
     
-    async def broadcast_event(self, event: Event) -> None:
+    async def broadcast_event(self, event: Event, parallel: bool = True) -> None:
         """Broadcast the specified event to all participants and let them process it concurrently.
         
         This method uses asyncio.gather to process all participants in parallel,
@@ -201,12 +349,22 @@ class Conversation:
         
         Args:
             event: The event to broadcast to all participants
+            parallel: Whether agents think concurrently; if False, they think one at a time
+                in the order they joined (default: True)
         """
+        # Compute the event embeddings once up front so that participants share them
+        # instead of each requesting the same embeddings, and finish any background
+        # interpretation since thought generation depends on it
+        preparation_tasks = [event.compute_all_embeddings(), event.wait_for_interpretation()]
+        
         # Ensure pred_next_turn is set before broadcasting
         if not event.pred_next_turn:
             from thoughtful_agents.utils.turn_taking_engine import predict_turn_taking_type
-            turn_allocation_type = await predict_turn_taking_type(self)
             # No need to set event.pred_next_turn as predict_turn_taking_type already does it
+            preparation_tasks.append(predict_turn_taking_type(self))
+        
+        await asyncio.gather(*preparation_tasks)
+        self.index_event_embeddings(event)
         
         # Get only Agent participants
         agent_participants = self.get_agents()
@@ -217,9 +375,21 @@ class Conversation:
             for participant in agent_participants
         ]
         
-        # Execute all think tasks concurrently
+        # Execute all think tasks concurrently (or in order); one participant failing
+        # should not cancel the others
         if process_tasks:
-            await asyncio.gather(*process_tasks)
+            if parallel:
+                results = await asyncio.gather(*process_tasks, return_exceptions=True)
+            else:
+                results = []
+                for think_coroutine in process_tasks:
+                    try:
+                        results.append(await think_coroutine)
+                    except Exception as e:
+                        results.append(e)
+            for participant, result in zip(agent_participants, results):
+                if isinstance(result, Exception):
+                    print(f"Error while {participant.name} was thinking: {str(result)}")
 
             
     # Getters
@@ -236,48 +406,84 @@ class Conversation:
         """
         return self.event_history[-n:]
     
+    def get_conversation_history(self, n: int = 5, until_event: Optional[Event] = None) -> str:
+        """Get the last n events formatted as "name: content" lines.
+        
+        Args:
+            n: Number of most recent events to include
+            until_event: If given, stop before this event
+            
+        Returns:
+            The formatted conversation history, one line per event
+        """
+        if n > self.FORMATTED_TAIL_SIZE:
+            # Older than the rolling buffer, render directly
+            lines = [(e.id, f"{e.participant_name}: {e.content}\n") for e in self.get_last_n_events(n)]
+        else:
+            lines = itertools.islice(self._formatted_tail, max(0, len(self._formatted_tail) - n), None)
+        
+        if until_event is None:
+            return "".join(line for _, line in lines)
+        
+        history = []
+        for event_id, line in lines:
+            if event_id == until_event.id:
+                break  # Stop when we reach the given event
+            history.append(line)
+        return "".join(history)
+    
     def get_agents(self) -> List['Participant']:
         """Get all participants that are Agent instances.
         
-        This is a utility method that filters the participants list to only include Agent instances.
+        Agents are tracked as they join, so this does not scan the participants list.
         
         Returns:
             List of participants that are Agent instances
         """
-        # Import Agent here to avoid circular imports
-        from thoughtful_agents.models.participant import Agent
-        
-        return [participant for participant in self.participants if isinstance(participant, Agent)]
+        return list(self._agents)
     
-    def get_by_id(self, event_id: str) -> Optional[Event]:
+    def get_by_id(self, event_id: Union[int, str]) -> Optional[Event]:
         """Get an event by its ID.
         
-        This method searches through all events to find one with a matching ID.
-        
         Args:
-            event_id: The ID of the event to find
+            event_id: The ID of the event to find, as an int or its string form (e.g. from a prompt reference)
             
         Returns:
             The event with the matching ID, or None if not found
         """
-        for event in self.event_history:
-            if event.id == event_id:
-                return event
-        return None
+        if isinstance(event_id, str):
+            try:
+                event_id = int(event_id)
+            except ValueError:
+                return None
+        return self._events_by_id.get(event_id)
+    
+    def topk_similar(self, query: NDArray[np.float32], k: int = 5, use_interpretation: bool = False) -> List[Event]:
+        """Get the k indexed events whose embeddings have the highest cosine similarity with a query.
+        
+        Args:
+            query: The query embedding
+            k: Number of events to return
+            use_interpretation: Whether to compare against interpretation embeddings instead of content embeddings
+            
+        Returns:
+            List of up to k events, most similar first
+        """
+        if use_interpretation:
+            index, events = self._interp_embeddings, self._interp_embedding_events
+        else:
+            index, events = self._embeddings, self._embedding_events
+        indices, _ = index.search(query, k)
+        return [events[i] for i in indices]
     
     def get_participant_by_id(self, participant_id: str) -> Optional['Participant']:
         """Get a participant by their ID.
         
-        This method searches through all participants to find one with a matching ID.
-        
         Args:
             participant_id: The ID of the participant to find
             
         Returns:
             The participant with the matching ID, or None if not found
         """
-        for participant in self.participants:
-            if participant.id == participant_id:
-                return participant
-        return None
+        return self._participants_by_id.get(participant_id)
     
@@ -1,13 +1,28 @@
-from typing import List, Optional
+import heapq
+import itertools
+import json
+import os
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+import numpy as np
+from numpy.typing import NDArray
 
 from thoughtful_agents.models.mental_object import MentalObject
 from thoughtful_agents.models.enums import MentalObjectType
+from thoughtful_agents.utils.embedding_matrix import EmbeddingMatrix, normalize_embedding
+from thoughtful_agents.utils.vector_index import FAISS_AVAILABLE, VectorIndex
+from thoughtful_agents.utils.scoring import saliency_scores, topk_indices
+
+# Files written under MemoryStore.persist_path
+_EMBEDDINGS_FILE = "long_term_embeddings.f32"
+_SIDECAR_FILE = "long_term_memory.json"
 
 class Memory(MentalObject):
     """Memory class that inherits from MentalObject."""
     
-    # Class variable to keep track of the next available Memory ID
-    _next_memory_id = 0
+    __slots__ = ()
+    
+    _next_memory_id = itertools.count()
     
     def __init__(
         self,
@@ -21,8 +36,7 @@ class Memory(MentalObject):
     ):
         # Generate a Memory-specific ID if not provided
         if id is None:
-            id = f"{Memory._next_memory_id}"
-            Memory._next_memory_id += 1
+            id = str(next(Memory._next_memory_id))
             
         super().__init__(
             id=id,
@@ -36,9 +50,79 @@ class Memory(MentalObject):
         # Additional memory-specific attributes can be added here
 
 class MemoryStore:
-    def __init__(self):
+    def __init__(
+        self,
+        quantize: Optional[bool] = None,
+        use_faiss: Optional[bool] = None,
+        query_cache_size: int = 128,
+        query_cache_threshold: float = 0.92,
+        persist_path: Optional[str] = None
+    ):
+        """Initialize an empty memory store.
+        
+        Args:
+            quantize: Whether the search index stores 8-bit embeddings. A float32 matrix of
+                every embedding is always kept for saliency scoring, so a quantized index
+                adds about a quarter of that on top, and makes search approximate; an
+                unquantized faiss index adds a full float32 copy, while the unquantized
+                NumPy backend searches the float32 matrix itself. None quantizes only
+                faiss indexes, which is the smallest option for either backend (default: None)
+            use_faiss: Whether to search with faiss (flat, then HNSW for large stores);
+                None uses it if installed (default: None)
+            query_cache_size: Number of recent search results to keep; 0 disables the cache (default: 128)
+            query_cache_threshold: Minimum cosine similarity between two queries for a search
+                to reuse the other's results (default: 0.92)
+            persist_path: Directory in which to keep long-term memory embeddings in a
+                memory-mapped float32 file instead of in RAM. Long-term searches then scan
+                the file with NumPy (quantize and use_faiss only apply to short-term
+                memories), and rows are only ever appended, so removed memories leave
+                unused rows behind. save() writes the rest of the memories next to it and
+                load() reopens them; a new store replaces anything saved there (default: None)
+        """
+        self.quantize = quantize
+        self.use_faiss = use_faiss
+        self.query_cache_threshold = query_cache_threshold
+        self.persist_path = persist_path
+        if persist_path is not None:
+            os.makedirs(persist_path, exist_ok=True)
         self.long_term_memory: List[Memory] = []
         self.short_term_memory: List[Memory] = []
+        
+        # Per-type similarity search indexes, with the memory stored at each row,
+        # and the same rows as a contiguous float32 matrix for saliency scoring.
+        # Memories added before their embedding was computed are kept pending and
+        # appended once it arrives. A type is marked stale when its index no longer
+        # matches the list (a removal) and is rebuilt on the next search. Indexed
+        # memories' embeddings are read-only views of their matrix rows, so each
+        # embedding is held once. With a persist_path, the long-term matrix is
+        # memory-mapped and doubles as the search index; a removal leaves its row
+        # as None (counted in _dead_rows) instead of rebuilding.
+        self._indexes: Dict[MentalObjectType, VectorIndex] = {}
+        self._embedding_matrices: Dict[MentalObjectType, EmbeddingMatrix] = {}
+        self._matrix_memories: Dict[MentalObjectType, List[Memory]] = {
+            MentalObjectType.MEMORY_LONG_TERM: [],
+            MentalObjectType.MEMORY_SHORT_TERM: []
+        }
+        self._pending_memories: Dict[MentalObjectType, List[Memory]] = {
+            MentalObjectType.MEMORY_LONG_TERM: [],
+            MentalObjectType.MEMORY_SHORT_TERM: []
+        }
+        self._dead_rows: Dict[MentalObjectType, int] = {
+            MentalObjectType.MEMORY_LONG_TERM: 0,
+            MentalObjectType.MEMORY_SHORT_TERM: 0
+        }
+        self._stale = {MentalObjectType.MEMORY_LONG_TERM, MentalObjectType.MEMORY_SHORT_TERM}
+        
+        # Recent searches as (query, memory types, k, store sizes, results). Cleared
+        # whenever memories are added or removed; the store sizes catch lists that
+        # were modified directly.
+        self._query_cache: Deque[Tuple[NDArray[np.float32], Tuple[MentalObjectType, ...], int, Tuple[int, int], List[Memory]]] = deque(maxlen=query_cache_size)
+    
+    def _memories_of(self, memory_type: MentalObjectType) -> List[Memory]:
+        """Get the list holding memories of a type."""
+        if memory_type == MentalObjectType.MEMORY_LONG_TERM:
+            return self.long_term_memory
+        return self.short_term_memory
     
     def add(self, memory: Memory) -> None:
         """Add a memory to the appropriate store."""
@@ -46,6 +130,46 @@ class MemoryStore:
             self.long_term_memory.append(memory)
         elif memory.type == MentalObjectType.MEMORY_SHORT_TERM:
             self.short_term_memory.append(memory)
+        else:
+            return
+        
+        self._query_cache.clear()
+        if memory.type in self._stale:
+            return
+        if memory.embedding is None:
+            self._pending_memories[memory.type].append(memory)
+        else:
+            self._append_row(memory)
+    
+    def _persistent(self, memory_type: MentalObjectType) -> bool:
+        """Check whether memories of a type are kept in the memory-mapped file."""
+        return self.persist_path is not None and memory_type == MentalObjectType.MEMORY_LONG_TERM
+    
+    def _append_row(self, memory: Memory) -> None:
+        """Append a memory's embedding to the index and matrix of its type."""
+        # Embeddings are normalized when set, so the row can be appended as is
+        index = self._indexes[memory.type]
+        matrix = self._embedding_matrices[memory.type]
+        capacity = matrix.capacity
+        if index.matrix is matrix:
+            row = index.add(memory.embedding)
+        else:
+            index.add(memory.embedding)
+            row = matrix.append(memory.embedding)
+        memories = self._matrix_memories[memory.type]
+        memories.append(memory)
+        if matrix.capacity == capacity:
+            memory.embedding = self._read_only_rows(matrix)[row]
+        else:
+            # The buffer was reallocated; point every embedding at the new one so the old one is freed
+            for indexed, embedding in zip(memories, self._read_only_rows(matrix)):
+                if indexed is not None:  # Unused rows of removed memories
+                    indexed.embedding = embedding
+    
+    def add_many(self, memories: List[Memory]) -> None:
+        """Add several memories to the appropriate stores."""
+        for memory in memories:
+            self.add(memory)
     
     def remove(self, memory: Memory) -> None:
         """Remove a memory from the appropriate store."""
@@ -53,6 +177,332 @@ class MemoryStore:
             self.long_term_memory.remove(memory)
         elif memory.type == MentalObjectType.MEMORY_SHORT_TERM:
             self.short_term_memory.remove(memory)
+        else:
+            return
+        
+        self._query_cache.clear()
+        pending = self._pending_memories[memory.type]
+        if memory in pending:
+            # Not indexed yet, so the index is unaffected
+            pending.remove(memory)
+        elif self._persistent(memory.type) and memory.type not in self._stale:
+            # Leave the row in the file rather than rewriting it
+            memories = self._matrix_memories[memory.type]
+            for row, indexed in enumerate(memories):
+                if indexed is memory:
+                    memories[row] = None
+                    self._dead_rows[memory.type] += 1
+                    break
+        else:
+            self._stale.add(memory.type)
+    
+    def _get_index(self, memory_type: MentalObjectType) -> VectorIndex:
+        """Get the search index for a memory type, rebuilding it if stale.
+        
+        Pending memories whose embeddings have been computed since they were
+        added are appended first.
+        """
+        all_memories = self._memories_of(memory_type)
+        pending = self._pending_memories[memory_type]
+        indexed_count = len(self._matrix_memories[memory_type]) - self._dead_rows[memory_type]
+        # A length mismatch means the list was modified directly rather than through add()
+        if memory_type in self._stale or indexed_count + len(pending) != len(all_memories):
+            if self._persistent(memory_type):
+                self._reconcile_persistent(all_memories)
+                return self._indexes[memory_type]
+            
+            use_faiss = FAISS_AVAILABLE if self.use_faiss is None else self.use_faiss
+            quantize = use_faiss if self.quantize is None else self.quantize
+            matrix = EmbeddingMatrix()
+            if use_faiss or quantize:
+                index = VectorIndex(quantize=quantize, use_faiss=use_faiss)
+            else:
+                index = VectorIndex(matrix=matrix)
+            memories = [memory for memory in all_memories if memory.embedding is not None]
+            if memories:
+                embeddings = np.stack([memory.embedding for memory in memories])
+                index.add_many(embeddings)
+                if index.matrix is not matrix:
+                    matrix.extend(embeddings)
+                del embeddings
+                for memory, row in zip(memories, self._read_only_rows(matrix)):
+                    memory.embedding = row
+            self._indexes[memory_type] = index
+            self._embedding_matrices[memory_type] = matrix
+            self._matrix_memories[memory_type] = memories
+            self._pending_memories[memory_type] = [memory for memory in all_memories if memory.embedding is None]
+            self._stale.discard(memory_type)
+        elif pending:
+            still_pending = []
+            for memory in pending:
+                if memory.embedding is None:
+                    still_pending.append(memory)
+                else:
+                    self._append_row(memory)
+            self._pending_memories[memory_type] = still_pending
+        return self._indexes[memory_type]
+    
+    def _reconcile_persistent(self, all_memories: List[Memory]) -> None:
+        """Bring the memory-mapped long-term matrix in line with the list by appending rows.
+        
+        Rows of memories no longer in the list become unused, and memories that
+        are not in the file yet are appended, so existing rows are never rewritten.
+        """
+        memory_type = MentalObjectType.MEMORY_LONG_TERM
+        if memory_type not in self._embedding_matrices:
+            # Start new files; unlink old ones rather than overwrite them, since
+            # views of the old embeddings file may still be in use
+            for name in (_EMBEDDINGS_FILE, _SIDECAR_FILE):
+                path = os.path.join(self.persist_path, name)
+                if os.path.exists(path):
+                    os.remove(path)
+            matrix = EmbeddingMatrix(path=os.path.join(self.persist_path, _EMBEDDINGS_FILE))
+            self._embedding_matrices[memory_type] = matrix
+            self._indexes[memory_type] = VectorIndex(matrix=matrix)
+            self._matrix_memories[memory_type] = []
+            self._dead_rows[memory_type] = 0
+        
+        listed = {id(memory) for memory in all_memories}
+        indexed = set()
+        matrix_memories = self._matrix_memories[memory_type]
+        for row, memory in enumerate(matrix_memories):
+            if memory is None:
+                continue
+            if id(memory) in listed:
+                indexed.add(id(memory))
+            else:
+                matrix_memories[row] = None
+                self._dead_rows[memory_type] += 1
+        
+        self._stale.discard(memory_type)
+        self._pending_memories[memory_type] = []
+        for memory in all_memories:
+            if id(memory) in indexed:
+                continue
+            if memory.embedding is None:
+                self._pending_memories[memory_type].append(memory)
+            else:
+                self._append_row(memory)
+    
+    @staticmethod
+    def _read_only_rows(matrix: EmbeddingMatrix) -> NDArray[np.float32]:
+        """Get a read-only view of a matrix's rows, to use as memory embeddings."""
+        rows = np.asarray(matrix.view())
+        rows.setflags(write=False)
+        return rows
+    
+    def save(self) -> None:
+        """Write long-term memories to persist_path.
+        
+        Embeddings are already in the memory-mapped file, which is flushed; the
+        other attributes of each memory are written to a JSON file next to it.
+        
+        Raises:
+            ValueError: If the store has no persist_path
+        """
+        if self.persist_path is None:
+            raise ValueError("MemoryStore has no persist_path to save to")
+        self._get_index(MentalObjectType.MEMORY_LONG_TERM)
+        matrix = self._embedding_matrices[MentalObjectType.MEMORY_LONG_TERM]
+        matrix.flush()
+        rows = {
+            id(memory): row
+            for row, memory in enumerate(self._matrix_memories[MentalObjectType.MEMORY_LONG_TERM])
+            if memory is not None
+        }
+        state = {
+            "n": len(matrix),
+            "dim": matrix.dim,
+            "memories": [
+                {
+                    "id": memory.id,
+                    "agent_id": memory.agent_id,
+                    "content": memory.content,
+                    "generated_turn": memory.generated_turn,
+                    "last_accessed_turn": memory.last_accessed_turn,
+                    "retrieval_count": memory.retrieval_count,
+                    "weight": memory.weight,
+                    "saliency": memory.saliency,
+                    "row": rows.get(id(memory))
+                }
+                for memory in self.long_term_memory
+            ]
+        }
+        # Write to a temporary file first so a crash never leaves a partial file
+        path = os.path.join(self.persist_path, _SIDECAR_FILE)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, persist_path: str, **kwargs) -> "MemoryStore":
+        """Reopen long-term memories written by save().
+        
+        Embeddings stay in the memory-mapped file, which is searched in place and
+        paged in as it is used.
+        
+        Args:
+            persist_path: Directory passed as persist_path to the store that was saved
+            **kwargs: Other arguments for the new store
+            
+        Returns:
+            A store holding the saved long-term memories, persisting to the same directory
+        """
+        store = cls(persist_path=persist_path, **kwargs)
+        with open(os.path.join(persist_path, _SIDECAR_FILE)) as f:
+            state = json.load(f)
+        
+        matrix = EmbeddingMatrix.open(os.path.join(persist_path, _EMBEDDINGS_FILE), state["n"], state["dim"] or 0)
+        rows = store._read_only_rows(matrix)
+        matrix_memories: List[Optional[Memory]] = [None] * len(matrix)
+        pending = []
+        for saved in state["memories"]:
+            row = saved.pop("row")
+            memory = Memory(
+                type=MentalObjectType.MEMORY_LONG_TERM,
+                embedding=None if row is None else rows[row],
+                compute_embedding=False,
+                **saved
+            )
+            store.long_term_memory.append(memory)
+            if row is None:
+                pending.append(memory)
+            else:
+                matrix_memories[row] = memory
+        
+        # The file is used as is; memories saved without an embedding stay pending
+        store._indexes[MentalObjectType.MEMORY_LONG_TERM] = VectorIndex(matrix=matrix)
+        store._embedding_matrices[MentalObjectType.MEMORY_LONG_TERM] = matrix
+        store._matrix_memories[MentalObjectType.MEMORY_LONG_TERM] = matrix_memories
+        store._dead_rows[MentalObjectType.MEMORY_LONG_TERM] = matrix_memories.count(None)
+        store._pending_memories[MentalObjectType.MEMORY_LONG_TERM] = pending
+        store._stale.discard(MentalObjectType.MEMORY_LONG_TERM)
+        return store
+    
+    def search(
+        self,
+        query_embedding: Union[NDArray[np.float32], List[float]],
+        k: int = 5,
+        memory_type: MentalObjectType = MentalObjectType.MEMORY_LONG_TERM
+    ) -> List[Memory]:
+        """Get the k memories whose embeddings have the highest cosine similarity with a query.
+        
+        Uses a faiss index when available (exact for small stores, HNSW once a store
+        holds many memories); otherwise, or for long-term memories with a persist_path,
+        all embeddings of a type are scored with a single matrix-vector product.
+        Memories without an embedding are skipped.
+        
+        Agents often search with near-identical queries, so the results of recent
+        searches are cached: a query whose cosine similarity with a cached query of
+        the same memory type is at least query_cache_threshold reuses its results.
+        
+        Args:
+            query_embedding: The query embedding
+            k: Number of memories to return
+            memory_type: Type of memories to search; any type other than long-term
+                or short-term searches both (default: long-term)
+            
+        Returns:
+            List of up to k memories, most similar first
+        """
+        query = normalize_embedding(query_embedding)
+        if memory_type in (MentalObjectType.MEMORY_LONG_TERM, MentalObjectType.MEMORY_SHORT_TERM):
+            memory_types = (memory_type,)
+        else:
+            memory_types = (MentalObjectType.MEMORY_LONG_TERM, MentalObjectType.MEMORY_SHORT_TERM)
+        
+        sizes = (len(self.long_term_memory), len(self.short_term_memory))
+        # Newest first, since repeated queries tend to be close together
+        for cached_query, cached_types, cached_k, cached_sizes, results in reversed(self._query_cache):
+            if (
+                cached_types == memory_types
+                and cached_k >= k
+                and cached_sizes == sizes
+                and len(cached_query) == len(query)
+                and float(cached_query @ query) >= self.query_cache_threshold
+            ):
+                return results[:k]
+        
+        candidates = []
+        for t in memory_types:
+            # Ask for enough extra rows to make up for unused ones
+            indices, scores = self._get_index(t).search(query, k + self._dead_rows[t])
+            memories = self._matrix_memories[t]
+            found = [(float(score), memories[i]) for i, score in zip(indices, scores) if memories[i] is not None]
+            candidates.extend(found[:k])
+        if len(memory_types) == 1:
+            results = [memory for _, memory in candidates]
+        else:
+            results = [memory for _, memory in heapq.nlargest(k, candidates, key=lambda x: x[0])]
+        
+        # Don't cache while memories are waiting for embeddings, since setting one
+        # changes the results without going through add()
+        if self._query_cache.maxlen and not any(self._pending_memories[t] for t in memory_types):
+            self._query_cache.append((query, memory_types, k, sizes, results))
+        return list(results)
+    
+    def recalibrate_saliency(
+        self,
+        utterance: Any,
+        memory_type: MentalObjectType = MentalObjectType.MEMORY_LONG_TERM,
+        decay_factor: float = 1.0,
+        b: float = 1.0,
+        c: float = 1.0
+    ) -> None:
+        """Recalibrate the saliency of all memories of a type based on an utterance.
+        
+        Same as saliency.recalibrate_all_saliency, but scores the store's contiguous
+        embedding matrix directly instead of stacking every memory's embedding, and
+        since memory embeddings are unit length, similarities are plain dot products.
+        
+        Args:
+            utterance: Utterance to compute similarity against (must have embedding, turn_number attributes)
+            memory_type: Type of memories to recalibrate (default: long-term)
+            decay_factor: Factor for time-based decay (default: 1.0)
+            b: Weight for interpretation similarity (default: 1.0)
+            c: Weight for text similarity (default: 1.0)
+        """
+        self._get_index(memory_type)
+        memories = self._matrix_memories[memory_type]
+        if not memories:
+            return
+        embeddings = self._embedding_matrices[memory_type].view()
+        if self._dead_rows[memory_type]:
+            # Unused rows are scored with zero weight and skipped below, which avoids copying the matrix
+            weights = np.fromiter((0.0 if memory is None else memory.weight for memory in memories), dtype=np.float32, count=len(memories))
+            last_accessed_turns = np.fromiter((0 if memory is None else memory.last_accessed_turn for memory in memories), dtype=np.int64, count=len(memories))
+        else:
+            weights = np.fromiter((memory.weight for memory in memories), dtype=np.float32, count=len(memories))
+            last_accessed_turns = np.fromiter((memory.last_accessed_turn for memory in memories), dtype=np.int64, count=len(memories))
+        
+        # Skip memories accessed after the utterance (e.g. if the utterance is from a previous turn)
+        current = last_accessed_turns <= utterance.turn_number
+        if not current.all():
+            embeddings, weights, last_accessed_turns = embeddings[current], weights[current], last_accessed_turns[current]
+            memories = [memory for memory, keep in zip(memories, current) if keep]
+            if not memories:
+                return
+        
+        interpretation_embedding = getattr(utterance, 'interpretation_embedding', None)
+        if interpretation_embedding is None:
+            interpretation_embedding = utterance.embedding
+        
+        saliencies = saliency_scores(
+            embeddings=embeddings,
+            interpretation_query=interpretation_embedding,
+            text_query=utterance.embedding,
+            weights=weights,
+            last_accessed_turns=last_accessed_turns,
+            current_turn=utterance.turn_number,
+            decay_factor=decay_factor,
+            b=b,
+            c=c,
+            normalized=True
+        )
+        for memory, saliency in zip(memories, saliencies.tolist()):
+            if memory is not None:
+                memory.saliency = saliency
     
     def retrieve_top_k(self, k: int, threshold: float = 0.3, memory_type: MentalObjectType = MentalObjectType.MEMORY_LONG_TERM) -> List[Memory]:
         """Retrieve top k memories based on the saliency score, that are at least above the threshold."""
@@ -62,8 +512,10 @@ class MemoryStore:
             memories = self.short_term_memory
         else:
             memories = self.long_term_memory + self.short_term_memory
-        memories = sorted(memories, key=lambda x: x.saliency, reverse=True)
-        return [memory for memory in memories if memory.saliency >= threshold][:k]
+        # Partial selection over a saliency array instead of sorting all memories
+        saliencies = np.fromiter((memory.saliency for memory in memories), dtype=np.float64, count=len(memories))
+        indices, _ = topk_indices(saliencies, k, threshold)
+        return [memories[i] for i in indices]
     
     def get_by_id(self, memory_id: str) -> Optional[Memory]:
         """Get a memory by its ID."""
@@ -3,9 +3,30 @@ from typing import List, Optional, Union
 from numpy.typing import NDArray
 
 from thoughtful_agents.models.enums import MentalObjectType
-from thoughtful_agents.utils.llm_api import get_embedding_sync, get_embedding_async
+from thoughtful_agents.utils.llm_api import get_embedding_sync, embedding_batcher
+from thoughtful_agents.utils.embedding_matrix import normalize_embedding
 
 class MentalObject:
+    """Base class for thoughts and memories.
+    
+    The embedding is L2-normalized when set, so cosine similarity between
+    embeddings is a plain dot product.
+    """
+    
+    # Agents accumulate many memories and thoughts, so avoid a per-instance __dict__
+    __slots__ = (
+        "id",
+        "agent_id",
+        "type",
+        "content",
+        "generated_turn",
+        "last_accessed_turn",
+        "retrieval_count",
+        "weight",
+        "saliency",
+        "embedding",
+    )
+    
     def __init__(
         self,
         id: str,
@@ -33,11 +54,7 @@ class MentalObject:
         
         # Handle embedding computation
         if embedding is not None:
-            # Convert list to numpy array if needed
-            if isinstance(embedding, list):
-                self.embedding = np.array(embedding, dtype=np.float32)
-            else:
-                self.embedding = embedding
+            self.embedding = normalize_embedding(embedding)
         elif compute_embedding:
             # Compute embedding synchronously
             self.embedding = self._compute_embedding_sync(content)
@@ -52,11 +69,11 @@ class MentalObject:
         use compute_embedding_async instead.
         """
         # Use the synchronous version of get_embedding
-        embedding_list = get_embedding_sync(text)
-        return np.array(embedding_list, dtype=np.float32)
+        embedding = get_embedding_sync(text)
+        return normalize_embedding(embedding)
     
     async def compute_embedding_async(self) -> None:
         """Compute embedding asynchronously if it wasn't computed in the constructor."""
         if self.embedding is None:
-            embedding_list = await get_embedding_async(self.content)
-            self.embedding = np.array(embedding_list, dtype=np.float32) 
\ No newline at end of file
+            embedding = await embedding_batcher.embed(self.content)
+            self.embedding = normalize_embedding(embedding) 
\ No newline at end of file
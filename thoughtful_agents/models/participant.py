@@ -1,4 +1,5 @@
-from typing import Dict, List, Optional, Union, TYPE_CHECKING, Callable, Any
+from typing import Dict, List, Optional, Tuple, Union, TYPE_CHECKING, Callable, Any
+import functools
 import random
 import asyncio
 import uuid
@@ -14,9 +15,19 @@ from thoughtful_agents.utils.thinking_engine import (
     articulate_thought
 )
 from thoughtful_agents.utils.saliency import recalibrate_all_saliency
+from thoughtful_agents.utils.llm_api import get_embeddings_sync, get_embeddings_async, LLMAPIError
 from thoughtful_agents.utils.text_splitter import SentenceSplitter
 
 
+@functools.lru_cache(maxsize=1)
+def _get_shared_text_splitter() -> SentenceSplitter:
+    """Get the sentence splitter shared by all agents (loading the spaCy pipeline once)."""
+    return SentenceSplitter()
+
+@functools.lru_cache(maxsize=1024)
+def _split_text_cached(splitter: SentenceSplitter, text: str, by_paragraphs: bool) -> Tuple[str, ...]:
+    """Split text with the given splitter, memoized so repeated texts (e.g. shared personas) are split once."""
+    return tuple(splitter.split_text(text, by_paragraphs=by_paragraphs))
 
 
 class Participant:
@@ -29,7 +40,7 @@ class Participant:
         **kwargs
     ):
         # Use provided ID or generate a UUID
-        self.id = id if id is not None else str(uuid.uuid4())
+        self.id = id if id is not None else uuid.uuid4().hex
             
         self.name = name
         self.type = type
@@ -39,13 +50,14 @@ class Participant:
         """Send a message to the conversation.
         
         This method creates an utterance event, records it in the conversation,
-        and immediately interprets it to ensure the interpretation is available
-        for all subsequent operations.
+        and starts interpreting it in the background, so the caller doesn't wait
+        on the LLM. Use event.wait_for_interpretation() to get the interpretation;
+        Conversation.broadcast_event and Agent.think wait for it automatically.
         
         Args:
             message: The message content
             conversation: The conversation to send the message to
-            interpret: Whether to interpret the message immediately
+            interpret: Whether to interpret the message
         """
         
         # Create the event
@@ -61,8 +73,9 @@ class Participant:
         conversation.record_event(event)
 
         if interpret:
-            # Interpret the event
-            await conversation.interpret_event(event)
+            conversation.schedule_interpretation(event)
+        await event.compute_embedding_async()
+        conversation.index_event_embeddings(event)
         
         # Update the last spoken turn
         self.last_spoken_turn = conversation.turn_number
@@ -74,6 +87,24 @@ class Human(Participant):
     def __init__(self, name: str, id: Optional[str] = None, **kwargs):
         super().__init__(name=name, type=ParticipantType.HUMAN, id=id, **kwargs)
 
+    async def get_response(self, prompt: Optional[str] = None) -> str:
+        """Read the human's next message from standard input.
+        
+        The blocking input() call runs in the default executor, so other participants
+        can keep thinking and calling the API while the human types.
+        
+        Args:
+            prompt: Prompt to show (default: "<name>: ")
+            
+        Returns:
+            The entered text, without surrounding whitespace
+        """
+        if prompt is None:
+            prompt = f"{self.name}: "
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(None, input, prompt)
+        return response.strip()
+
 class Agent(Participant):
     def __init__(
         self,
@@ -86,7 +117,7 @@ class Agent(Participant):
         self.thought_reservoir = ThoughtReservoir()
         self.memory_store = MemoryStore()
         self.proactivity_config = proactivity_config
-        self.text_splitter = SentenceSplitter()
+        self.text_splitter = _get_shared_text_splitter()
        
 
     async def think(self, conversation: Conversation, event: 'Event') -> None:
@@ -127,15 +158,16 @@ class Agent(Participant):
         Args:
             event: The event to use for recalibration
         """
+        # Make sure a background interpretation of the event has finished, so
+        # saliency uses the interpretation embedding
+        await event.wait_for_interpretation()
+        
         # Ensure the event has an embedding
         if event.embedding is None:
             await event.compute_embedding_async()
             
         # Recalibrate long-term memories
-        recalibrate_all_saliency(
-            items=self.memory_store.long_term_memory,
-            utterance=event
-        )
+        self.memory_store.recalibrate_saliency(event, memory_type=MentalObjectType.MEMORY_LONG_TERM)
         
         # Recalibrate thoughts
         recalibrate_all_saliency(
@@ -295,13 +327,14 @@ class Agent(Participant):
         Returns:
             None
         """
-        # Create a memory from the event
+        # Create a memory from the event, reusing the event embedding if it has one
         memory = Memory(
             agent_id=self.id,
             type=memory_type,
             content=event.content,
             generated_turn=event.turn_number,
             last_accessed_turn=event.turn_number,
+            embedding=event.embedding,
             compute_embedding=compute_embedding
         )
         
@@ -327,17 +360,72 @@ class Agent(Participant):
         text = text.strip()
 
         # Split the text into chunks
-        chunks = self.text_splitter.split_text(text, by_paragraphs=by_paragraphs)
+        chunks = list(_split_text_cached(self.text_splitter, text, by_paragraphs))
 
+        # Embed all chunks with a single batched request
+        embeddings = get_embeddings_sync(chunks) if compute_embedding and chunks else [None] * len(chunks)
 
-        for chunk in chunks:
-            # Create a memory for each chunk
-            memory = Memory(
+        # Create a memory for each chunk
+        memories = [
+            Memory(
                 agent_id=self.id,
                 type=memory_type,
                 content=chunk,
                 generated_turn=0,
                 last_accessed_turn=0,
-                compute_embedding=compute_embedding
+                embedding=embedding,
+                compute_embedding=False
             )
-            self.memory_store.add(memory)
\ No newline at end of file
+            for chunk, embedding in zip(chunks, embeddings)
+        ]
+        self.memory_store.add_many(memories)
+        
+    async def initialize_memory_async(self, text: str, memory_type: MentalObjectType = MentalObjectType.MEMORY_LONG_TERM, by_paragraphs: bool = False) -> None:
+        """Initialize the agent's memory with a text without blocking the event loop.
+        
+        Same as initialize_memory, but the chunk embeddings are requested
+        asynchronously, as a single batched request.
+
+        Args:
+            text: The text to parse and add as memory
+            memory_type: The type of memory to create (default: MEMORY_LONG_TERM)
+            by_paragraphs: Whether to split by paragraphs first (default: False)
+
+        Raises:
+            LLMAPIError: If computing an embedding fails at the API
+            RuntimeError: If computing an embedding fails for another reason
+
+        Returns:
+            None
+        """
+        # Clean whitespace from the text
+        text = text.strip()
+
+        # Split the text into chunks
+        chunks = _split_text_cached(self.text_splitter, text, by_paragraphs)
+
+        if not chunks:
+            return
+
+        # Embed all chunks with a single batched request
+        try:
+            embeddings = await get_embeddings_async(list(chunks))
+        except LLMAPIError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Error computing memory embedding: {str(e)}") from e
+
+        # Create a memory for each chunk
+        memories = [
+            Memory(
+                agent_id=self.id,
+                type=memory_type,
+                content=chunk,
+                generated_turn=0,
+                last_accessed_turn=0,
+                embedding=embedding,
+                compute_embedding=False
+            )
+            for chunk, embedding in zip(chunks, embeddings)
+        ]
+        self.memory_store.add_many(memories)
@@ -1,3 +1,4 @@
+import heapq
 from typing import List, Union, Optional, Dict, TYPE_CHECKING
 import uuid
 
@@ -11,6 +12,8 @@ if TYPE_CHECKING:
 class Thought(MentalObject):
     # _next_thought_id class variable removed as we're switching to UUID
     
+    __slots__ = ("intrinsic_motivation", "stimuli", "selected")
+    
     def __init__(
         self,
         agent_id: int,
@@ -22,8 +25,8 @@ class Thought(MentalObject):
         stimuli: List[Union[MentalObject, 'Event']],
         **kwargs
     ):
-        # Always generate a UUID
-        id = str(uuid.uuid4())
+        # Always generate a UUID (32 hex characters, without dashes)
+        id = uuid.uuid4().hex
             
         super().__init__(
             id=id,
@@ -58,8 +61,8 @@ class ThoughtReservoir:
             thoughts = [thought for thought in self.thoughts if thought.type == thought_type]
         else:
             thoughts = self.thoughts
-        thoughts = sorted(thoughts, key=lambda x: x.saliency, reverse=True)
-        return [thought for thought in thoughts if thought.saliency >= threshold][:k]
+        # Bounded heap selection instead of sorting all thoughts
+        return heapq.nlargest(k, (thought for thought in thoughts if thought.saliency >= threshold), key=lambda x: x.saliency)
     
     def get_selected_thoughts(self) -> List[Thought]:
         """Get all thoughts that have been selected for articulation."""
@@ -0,0 +1,246 @@
+"""Contiguous storage for embeddings to support vectorized similarity search."""
+import os
+from typing import Optional, Tuple, Union, List
+import numpy as np
+from numpy.typing import NDArray
+
+try:
+    import simsimd
+    SIMSIMD_AVAILABLE = True
+except ImportError:
+    SIMSIMD_AVAILABLE = False
+
+# Number of int8 rows converted to float32 at a time when scoring, which keeps
+# the temporary buffer small enough to stay in cache
+_SCORE_BLOCK_ROWS = 1024
+
+def normalize_embedding(embedding: Union[NDArray[np.float32], List[float]]) -> NDArray[np.float32]:
+    """Convert an embedding to a unit-length float32 array.
+
+    Args:
+        embedding: The embedding to normalize
+
+    Returns:
+        A float32 array with L2 norm 1 (or all zeros if the input is all zeros).
+        Read-only float32 inputs that are already unit length, such as
+        embeddings decoded from the API, are returned without copying; any
+        other input is copied.
+    """
+    if (
+        isinstance(embedding, np.ndarray)
+        and embedding.dtype == np.float32
+        and not embedding.flags.writeable
+        and abs(float(embedding @ embedding) - 1.0) <= 1e-4
+    ):
+        return embedding
+    embedding = np.array(embedding, dtype=np.float32)
+    norm = np.linalg.norm(embedding)
+    if norm > 0:
+        embedding /= norm
+    return embedding
+
+def quantize_int8(embedding: Union[NDArray[np.float32], List[float]]) -> Tuple[NDArray[np.int8], float]:
+    """Quantize an embedding to int8 with a symmetric per-vector scale.
+
+    Args:
+        embedding: The embedding to quantize
+
+    Returns:
+        Tuple of (int8 values, scale) such that values * scale approximates the embedding
+    """
+    embedding = np.asarray(embedding, dtype=np.float32)
+    max_abs = float(np.abs(embedding).max()) if embedding.size else 0.0
+    scale = max_abs / 127.0 if max_abs > 0 else 1.0
+    return np.round(embedding / scale).astype(np.int8), scale
+
+class EmbeddingMatrix:
+    """Growable (N, d) matrix of embeddings.
+
+    Rows are appended with amortized O(1) cost by doubling the capacity when the
+    buffer is full. The embedding dimension is taken from the first row added.
+    
+    With quantize=True, rows are stored as int8 with a float32 scale per row,
+    which uses a quarter of the memory. If SimSIMD is installed, int8 rows are
+    scored with its SIMD int8 dot product kernel against an int8-quantized
+    query; otherwise they are converted to float32 in blocks.
+    
+    With a path, float32 rows are stored in a memory-mapped file instead of
+    RAM, so the matrix can be larger than memory and the OS page cache keeps
+    the rows in use resident. Growing the buffer extends the file.
+    """
+
+    def __init__(self, initial_capacity: int = 64, quantize: bool = False, path: Optional[str] = None):
+        """Initialize an empty matrix.
+
+        Args:
+            initial_capacity: Number of rows to allocate on the first append (default: 64)
+            quantize: Whether to store rows as int8 with a per-row scale (default: False)
+            path: File to memory-map the rows to; it is overwritten on the first append (default: None)
+            
+        Raises:
+            ValueError: If both quantize and path are set
+        """
+        if quantize and path is not None:
+            raise ValueError("Memory-mapped storage is only supported for float32 rows")
+        self.initial_capacity = initial_capacity
+        self.quantize = quantize
+        self.path = path
+        self._data: Optional[NDArray] = None
+        self._scales: Optional[NDArray[np.float32]] = None
+        self._size = 0
+
+    @classmethod
+    def open(cls, path: str, rows: int, dim: int) -> "EmbeddingMatrix":
+        """Reopen a memory-mapped matrix written by an earlier EmbeddingMatrix.
+
+        Args:
+            path: File holding the rows
+            rows: Number of rows in use
+            dim: Embedding dimension
+
+        Returns:
+            A float32 matrix of the given rows, backed by the file
+        """
+        matrix = cls(path=path)
+        if rows > 0:
+            capacity = max(rows, os.path.getsize(path) // (dim * np.dtype(np.float32).itemsize))
+            matrix._data = np.memmap(path, dtype=np.float32, mode="r+", shape=(capacity, dim))
+            matrix._scales = np.ones(capacity, dtype=np.float32)
+            matrix._size = rows
+        return matrix
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def dim(self) -> Optional[int]:
+        """Embedding dimension, or None if no rows have been added."""
+        return None if self._data is None else self._data.shape[1]
+
+    @property
+    def capacity(self) -> int:
+        """Number of rows allocated."""
+        return 0 if self._data is None else self._data.shape[0]
+
+    def append(self, embedding: Union[NDArray[np.float32], List[float]]) -> int:
+        """Append an embedding as a new row.
+
+        Args:
+            embedding: The embedding to append
+
+        Returns:
+            The row index of the appended embedding
+        """
+        self._reserve(self._size + 1, len(embedding))
+        if self.quantize:
+            self._data[self._size], self._scales[self._size] = quantize_int8(embedding)
+        else:
+            self._data[self._size] = embedding
+        self._size += 1
+        return self._size - 1
+
+    def extend(self, embeddings: Union[NDArray[np.float32], List[List[float]]]) -> None:
+        """Append several embeddings as new rows, growing the buffer at most once.
+
+        Args:
+            embeddings: (M, d) embeddings to append
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if len(embeddings) == 0:
+            return
+        stop = self._size + len(embeddings)
+        self._reserve(stop, embeddings.shape[1])
+        if self.quantize:
+            max_abs = np.abs(embeddings).max(axis=1)
+            scales = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+            self._data[self._size:stop] = np.round(embeddings / scales[:, None]).astype(np.int8)
+            self._scales[self._size:stop] = scales
+        else:
+            self._data[self._size:stop] = embeddings
+        self._size = stop
+
+    def _reserve(self, rows: int, dim: int) -> None:
+        """Make room for at least the given number of rows, doubling the capacity as needed."""
+        dtype = np.int8 if self.quantize else np.float32
+        if self._data is None:
+            capacity = max(self.initial_capacity, rows)
+            if self.path is not None:
+                self._data = np.memmap(self.path, dtype=dtype, mode="w+", shape=(capacity, dim))
+            else:
+                self._data = np.empty((capacity, dim), dtype=dtype)
+            self._scales = np.ones(capacity, dtype=np.float32)
+        elif rows > self._data.shape[0]:
+            capacity = self._data.shape[0]
+            while capacity < rows:
+                capacity *= 2
+            if self.path is not None:
+                # Reopening with a larger shape extends the file; existing rows stay in place
+                self._data.flush()
+                self._data = np.memmap(self.path, dtype=dtype, mode="r+", shape=(capacity, self._data.shape[1]))
+            else:
+                grown = np.empty((capacity, self._data.shape[1]), dtype=dtype)
+                grown[:self._size] = self._data[:self._size]
+                self._data = grown
+            scales = np.ones(capacity, dtype=np.float32)
+            scales[:self._size] = self._scales[:self._size]
+            self._scales = scales
+
+    def flush(self) -> None:
+        """Write memory-mapped rows to disk (no-op for in-memory matrices)."""
+        if isinstance(self._data, np.memmap):
+            self._data.flush()
+
+    def view(self) -> NDArray:
+        """Get a (N, d) view of the stored rows (no copy); int8 if quantized."""
+        if self._data is None:
+            return np.empty((0, 0), dtype=np.int8 if self.quantize else np.float32)
+        return self._data[:self._size]
+
+    def scales(self) -> NDArray[np.float32]:
+        """Get the per-row scales (all ones unless quantized)."""
+        if self._scales is None:
+            return np.empty(0, dtype=np.float32)
+        return self._scales[:self._size]
+
+    def scores(self, query: NDArray[np.float32]) -> NDArray[np.float32]:
+        """Compute the dot product of every stored row with a query vector."""
+        if self._size == 0:
+            return np.empty(0, dtype=np.float32)
+        query = np.asarray(query, dtype=np.float32)
+        if not self.quantize:
+            return self.view() @ query
+
+        data = self.view()
+        if SIMSIMD_AVAILABLE:
+            # int8 x int8 dot products in SIMD registers, without a float32 copy of the rows
+            query_values, query_scale = quantize_int8(query)
+            scores = np.asarray(simsimd.cdist(query_values[None, :], data, metric="dot"), dtype=np.float32)[0]
+            scores *= query_scale
+        else:
+            # Convert int8 rows to float32 one block at a time
+            scores = np.empty(self._size, dtype=np.float32)
+            for start in range(0, self._size, _SCORE_BLOCK_ROWS):
+                stop = min(start + _SCORE_BLOCK_ROWS, self._size)
+                scores[start:stop] = data[start:stop].astype(np.float32) @ query
+        scores *= self.scales()
+        return scores
+
+    def topk(self, query: NDArray[np.float32], k: int) -> Tuple[NDArray[np.intp], NDArray[np.float32]]:
+        """Find the k rows with the highest dot product with a query vector.
+
+        Args:
+            query: The query vector
+            k: Number of rows to return
+
+        Returns:
+            Tuple of (row indices, scores), sorted by descending score
+        """
+        scores = self.scores(query)
+        k = min(k, len(scores))
+        if k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+
+        # Partial selection of the top k, then sort only those k
+        idx = np.argpartition(-scores, k - 1)[:k]
+        idx = idx[np.argsort(-scores[idx])]
+        return idx, scores[idx]
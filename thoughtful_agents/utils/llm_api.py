@@ -1,10 +1,18 @@
 """OpenAI API interaction functions."""
 import os
-from typing import List, Dict, Optional, Any
-from openai import OpenAI, APIError
+from typing import List, Dict, Optional, Any, Set, Tuple, Union
+from openai import OpenAI, AsyncOpenAI, APIError
+import httpx
+import numpy as np
+from numpy.typing import NDArray
+import base64
 import logging
 import asyncio
 import time
+import weakref
+import atexit
+
+from thoughtful_agents.utils.semantic_cache import embedding_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,12 +25,46 @@ logging.getLogger("httpx").setLevel(logging.WARNING)
 DEFAULT_COMPLETION_MODEL = os.getenv("COMPLETION_MODEL", "gpt-4o")
 DEFAULT_EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
 
+# Maximum number of inputs accepted by a single embeddings request
+MAX_EMBEDDING_BATCH_SIZE = 2048
+
 class LLMAPIError(Exception):
     """Custom exception for LLM API errors."""
     pass
 
+def _decode_embedding(embedding: Union[str, List[float]]) -> NDArray[np.float32]:
+    """Decode an embedding from an API response.
+    
+    Embeddings are requested base64-encoded, which is the raw little-endian
+    float32 buffer, so they decode straight into an array without creating a
+    Python float per value. The returned array is read-only.
+    """
+    if isinstance(embedding, str):
+        return np.frombuffer(base64.b64decode(embedding), dtype=np.float32)
+    return np.asarray(embedding, dtype=np.float32)
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Connection pool settings shared by all API clients
+HTTP_TIMEOUT = 30.0
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
+# Clients are reused so that requests share pooled TCP/TLS connections
+_sync_clients: Dict[str, OpenAI] = {}
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[str, AsyncOpenAI]]" = weakref.WeakKeyDictionary()
+
+def _get_api_key() -> str:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise LLMAPIError("OPENAI_API_KEY environment variable not set")
+    return api_key
+
 def get_client() -> OpenAI:
-    """Get OpenAI client with API key validation.
+    """Get the shared OpenAI client with API key validation.
     
     Returns:
         OpenAI client instance
@@ -30,10 +72,64 @@ def get_client() -> OpenAI:
     Raises:
         LLMAPIError: If OPENAI_API_KEY is not set
     """
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise LLMAPIError("OPENAI_API_KEY environment variable not set")
-    return OpenAI(api_key=api_key)
+    api_key = _get_api_key()
+    client = _sync_clients.get(api_key)
+    if client is None:
+        client = OpenAI(
+            api_key=api_key,
+            timeout=HTTP_TIMEOUT,
+            http_client=httpx.Client(http2=HTTP2_AVAILABLE, timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+        )
+        _sync_clients[api_key] = client
+    return client
+
+def get_async_client() -> AsyncOpenAI:
+    """Get the shared async OpenAI client for the running event loop.
+    
+    Pooled connections belong to the event loop that opened them, so one
+    client is kept per loop.
+    
+    Returns:
+        AsyncOpenAI client instance
+        
+    Raises:
+        LLMAPIError: If OPENAI_API_KEY is not set
+    """
+    api_key = _get_api_key()
+    loop = asyncio.get_running_loop()
+    cached = _async_clients.get(loop)
+    if cached is not None and cached[0] == api_key:
+        return cached[1]
+    
+    client = AsyncOpenAI(
+        api_key=api_key,
+        timeout=HTTP_TIMEOUT,
+        http_client=httpx.AsyncClient(http2=HTTP2_AVAILABLE, timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+    )
+    _async_clients[loop] = (api_key, client)
+    return client
+
+def close_clients() -> None:
+    """Close the shared sync client and its pooled connections.
+    
+    Registered with atexit; later calls to get_client create a new client.
+    """
+    for client in _sync_clients.values():
+        client.close()
+    _sync_clients.clear()
+
+async def aclose_async_client() -> None:
+    """Close the shared async client of the running event loop.
+    
+    Call this before the event loop shuts down (e.g. at the end of the coroutine
+    passed to asyncio.run), since pooled async connections cannot be closed
+    once their loop is gone. Later calls to get_async_client create a new client.
+    """
+    cached = _async_clients.pop(asyncio.get_running_loop(), None)
+    if cached is not None:
+        await cached[1].close()
+
+atexit.register(close_clients)
 
 async def get_completion(
     system_prompt: str,
@@ -61,7 +157,7 @@ async def get_completion(
     Raises:
         LLMAPIError: If API call fails after max_retries
     """
-    client = get_client()
+    client = get_async_client()
     for attempt in range(max_retries):
         try:
             completion_args = {
@@ -78,7 +174,7 @@ async def get_completion(
             if response_format:
                 completion_args["response_format"] = {"type": response_format}
             
-            response = client.chat.completions.create(**completion_args)
+            response = await client.chat.completions.create(**completion_args)
             
             result = {"text": response.choices[0].message.content}
             return result
@@ -105,7 +201,7 @@ async def get_embedding_async(
     text: str,
     model: str = DEFAULT_EMBEDDING_MODEL,
     max_retries: int = 3
-) -> List[float]:
+) -> NDArray[np.float32]:
     """Get embedding asynchronously from OpenAI API.
     
     Args:
@@ -114,22 +210,29 @@ async def get_embedding_async(
         max_retries: Maximum number of retries on API error (default: 3)
         
     Returns:
-        List of embedding values
+        Embedding as a float32 array
         
     Raises:
         LLMAPIError: If API call fails after max_retries
     """
     if not text.strip():
         raise ValueError("Empty text provided for embedding")
+    
+    cached = embedding_cache.get(text, model)
+    if cached is not None:
+        return cached
         
-    client = get_client()
+    client = get_async_client()
     for attempt in range(max_retries):
         try:
-            response = client.embeddings.create(
+            response = await client.embeddings.create(
                 model=model,
-                input=text
+                input=text,
+                encoding_format="base64"
             )
-            return response.data[0].embedding
+            embedding = _decode_embedding(response.data[0].embedding)
+            embedding_cache.put(text, model, embedding)
+            return embedding
             
         except APIError as e:
             if e.status_code == 429:  # Rate limit error
@@ -152,31 +255,42 @@ def get_embedding_sync(
     text: str,
     model: str = DEFAULT_EMBEDDING_MODEL,
     max_retries: int = 3
-) -> List[float]:
+) -> NDArray[np.float32]:
     """Get embedding synchronously from OpenAI API.
     
+    This blocks the calling thread, so it is meant for synchronous entry points
+    (e.g. Agent.initialize_memory) and notebook/REPL use. Async code should use
+    embedding_batcher.embed instead.
+    
     Args:
         text: Text to get embedding for
         model: Model to use (default: from environment variable or text-embedding-3-small)
         max_retries: Maximum number of retries on API error (default: 3)
         
     Returns:
-        List of embedding values
+        Embedding as a float32 array
         
     Raises:
         LLMAPIError: If API call fails after max_retries
     """
     if not text.strip():
         raise ValueError("Empty text provided for embedding")
+    
+    cached = embedding_cache.get(text, model)
+    if cached is not None:
+        return cached
         
     client = get_client()
     for attempt in range(max_retries):
         try:
             response = client.embeddings.create(
                 model=model,
-                input=text
+                input=text,
+                encoding_format="base64"
             )
-            return response.data[0].embedding
+            embedding = _decode_embedding(response.data[0].embedding)
+            embedding_cache.put(text, model, embedding)
+            return embedding
             
         except APIError as e:
             if e.status_code == 429:  # Rate limit error
@@ -193,4 +307,227 @@ def get_embedding_sync(
             logger.error(f"Unexpected error: {str(e)}")
             raise LLMAPIError(f"Unexpected error: {str(e)}")
     
-    raise LLMAPIError("Max retries exceeded") 
+    raise LLMAPIError("Max retries exceeded")
+
+
+# Batched versions of the embedding functions
+async def get_embeddings_async(
+    texts: List[str],
+    model: str = DEFAULT_EMBEDDING_MODEL,
+    max_retries: int = 3
+) -> List[NDArray[np.float32]]:
+    """Get embeddings for several texts asynchronously from OpenAI API.
+    
+    All texts are sent in a single request (or one request per
+    MAX_EMBEDDING_BATCH_SIZE texts, sent concurrently), so embedding K texts
+    costs one round trip instead of K.
+    
+    Args:
+        texts: Texts to get embeddings for
+        model: Model to use (default: from environment variable or text-embedding-3-small)
+        max_retries: Maximum number of retries on API error (default: 3)
+        
+    Returns:
+        List of float32 embedding arrays, in the same order as texts
+        
+    Raises:
+        LLMAPIError: If API call fails after max_retries
+    """
+    if any(not text.strip() for text in texts):
+        raise ValueError("Empty text provided for embedding")
+    
+    # Only request texts that are not cached yet
+    embeddings = [embedding_cache.get(text, model) for text in texts]
+    missing = list(dict.fromkeys(text for text, embedding in zip(texts, embeddings) if embedding is None))
+    
+    batches = [missing[start:start + MAX_EMBEDDING_BATCH_SIZE] for start in range(0, len(missing), MAX_EMBEDDING_BATCH_SIZE)]
+    results = await asyncio.gather(*(_create_embeddings_async(batch, model, max_retries) for batch in batches))
+    
+    fetched: Dict[str, NDArray[np.float32]] = {}
+    for batch, batch_embeddings in zip(batches, results):
+        for text, embedding in zip(batch, batch_embeddings):
+            embedding_cache.put(text, model, embedding)
+            fetched[text] = embedding
+    
+    return [embedding if embedding is not None else fetched[text] for text, embedding in zip(texts, embeddings)]
+
+async def _create_embeddings_async(texts: List[str], model: str, max_retries: int) -> List[NDArray[np.float32]]:
+    """Issue a single embeddings request for a batch of texts."""
+    client = get_async_client()
+    for attempt in range(max_retries):
+        try:
+            response = await client.embeddings.create(
+                model=model,
+                input=texts,
+                encoding_format="base64"
+            )
+            return [_decode_embedding(item.embedding) for item in sorted(response.data, key=lambda item: item.index)]
+            
+        except APIError as e:
+            if e.status_code == 429:  # Rate limit error
+                if attempt < max_retries - 1:
+                    wait_time = 2 ** attempt  # Exponential backoff
+                    logger.warning(f"Rate limit hit, retrying in {wait_time} seconds...")
+                    await asyncio.sleep(wait_time)
+                    continue
+            logger.error(f"OpenAI API error: {str(e)}")
+            raise LLMAPIError(f"OpenAI API error: {str(e)}")
+            
+        except Exception as e:
+            logger.error(f"Unexpected error: {str(e)}")
+            raise LLMAPIError(f"Unexpected error: {str(e)}")
+    
+    raise LLMAPIError("Max retries exceeded")
+
+def get_embeddings_sync(
+    texts: List[str],
+    model: str = DEFAULT_EMBEDDING_MODEL,
+    max_retries: int = 3
+) -> List[NDArray[np.float32]]:
+    """Get embeddings for several texts synchronously from OpenAI API.
+    
+    Args:
+        texts: Texts to get embeddings for
+        model: Model to use (default: from environment variable or text-embedding-3-small)
+        max_retries: Maximum number of retries on API error (default: 3)
+        
+    Returns:
+        List of float32 embedding arrays, in the same order as texts
+        
+    Raises:
+        LLMAPIError: If API call fails after max_retries
+    """
+    if any(not text.strip() for text in texts):
+        raise ValueError("Empty text provided for embedding")
+    
+    # Only request texts that are not cached yet
+    embeddings = [embedding_cache.get(text, model) for text in texts]
+    missing = list(dict.fromkeys(text for text, embedding in zip(texts, embeddings) if embedding is None))
+    
+    fetched: Dict[str, NDArray[np.float32]] = {}
+    for start in range(0, len(missing), MAX_EMBEDDING_BATCH_SIZE):
+        batch = missing[start:start + MAX_EMBEDDING_BATCH_SIZE]
+        for text, embedding in zip(batch, _create_embeddings_sync(batch, model, max_retries)):
+            embedding_cache.put(text, model, embedding)
+            fetched[text] = embedding
+    
+    return [embedding if embedding is not None else fetched[text] for text, embedding in zip(texts, embeddings)]
+
+def _create_embeddings_sync(texts: List[str], model: str, max_retries: int) -> List[NDArray[np.float32]]:
+    """Issue a single blocking embeddings request for a batch of texts."""
+    client = get_client()
+    for attempt in range(max_retries):
+        try:
+            response = client.embeddings.create(
+                model=model,
+                input=texts,
+                encoding_format="base64"
+            )
+            return [_decode_embedding(item.embedding) for item in sorted(response.data, key=lambda item: item.index)]
+            
+        except APIError as e:
+            if e.status_code == 429:  # Rate limit error
+                if attempt < max_retries - 1:
+                    wait_time = 2 ** attempt  # Exponential backoff
+                    logger.warning(f"Rate limit hit, retrying in {wait_time} seconds...")
+                    time.sleep(wait_time)
+                    continue
+            logger.error(f"OpenAI API error: {str(e)}")
+            raise LLMAPIError(f"OpenAI API error: {str(e)}")
+            
+        except Exception as e:
+            logger.error(f"Unexpected error: {str(e)}")
+            raise LLMAPIError(f"Unexpected error: {str(e)}")
+    
+    raise LLMAPIError("Max retries exceeded")
+
+
+class EmbeddingBatcher:
+    """Coalesce concurrent embedding requests into batched API calls.
+    
+    Each call to embed() is queued; the queue is flushed as one embeddings
+    request after max_delay seconds, or as soon as batch_size texts are pending.
+    Identical texts within a batch are only sent once. Pending texts and the
+    flush timer are kept per event loop, since futures and timers belong to the
+    loop that created them.
+    """
+    
+    def __init__(
+        self,
+        model: str = DEFAULT_EMBEDDING_MODEL,
+        batch_size: int = 64,
+        max_delay: float = 0.005
+    ):
+        """Initialize the batcher.
+        
+        Args:
+            model: Embedding model to use (default: from environment variable or text-embedding-3-small)
+            batch_size: Number of pending texts that triggers an immediate flush (default: 64)
+            max_delay: Seconds to wait for more texts before flushing (default: 0.005)
+        """
+        self.model = model
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._pending: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, List[Tuple[str, asyncio.Future]]]" = weakref.WeakKeyDictionary()
+        self._timers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.TimerHandle]" = weakref.WeakKeyDictionary()
+        self._tasks: Set[asyncio.Task] = set()
+    
+    async def embed(self, text: str) -> NDArray[np.float32]:
+        """Queue a text for embedding and wait for its batch to complete.
+        
+        Args:
+            text: Text to get embedding for
+            
+        Returns:
+            Embedding as a float32 array
+            
+        Raises:
+            LLMAPIError: If the batched API call fails
+        """
+        if not text.strip():
+            raise ValueError("Empty text provided for embedding")
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(loop, [])
+        pending.append((text, future))
+        
+        if len(pending) >= self.batch_size:
+            self._flush(loop)
+        elif loop not in self._timers:
+            self._timers[loop] = loop.call_later(self.max_delay, self._flush, loop)
+        
+        return await future
+    
+    def _flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Send all texts pending on an event loop as a single batch."""
+        timer = self._timers.pop(loop, None)
+        if timer is not None:
+            timer.cancel()
+        
+        batch = self._pending.pop(loop, [])
+        if batch:
+            task = loop.create_task(self._send(batch))
+            # Keep a reference so the task is not garbage collected mid-flight
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _send(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Embed a batch of texts and resolve the waiting futures."""
+        # Deduplicate while preserving order
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            embeddings = await get_embeddings_async(texts, model=self.model)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        embeddings_by_text = dict(zip(texts, embeddings))
+        for text, future in batch:
+            if not future.done():
+                future.set_result(embeddings_by_text[text])
+
+# Shared batcher used by the models for all asynchronous embedding requests
+embedding_batcher = EmbeddingBatcher()
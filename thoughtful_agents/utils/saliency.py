@@ -3,6 +3,8 @@ from typing import List, Any
 import numpy as np
 from numpy.typing import NDArray
 
+from thoughtful_agents.utils.scoring import saliency_scores
+
 def compute_similarity(embedding1: NDArray, embedding2: NDArray) -> float:
     """Compute cosine similarity between two embeddings."""
     return float(np.dot(embedding1, embedding2) / (np.linalg.norm(embedding1) * np.linalg.norm(embedding2)))
@@ -65,17 +67,30 @@ def recalibrate_all_saliency(
         b: Weight for interpretation similarity (default: 1.0)
         c: Weight for text similarity (default: 1.0)
     """
-    for item in items:
-        # Skip items that were created after the utterance
-        # This can happen if the utterance is from a previous turn
-        if utterance.turn_number < item.last_accessed_turn:
-            continue
-            
-        # Compute saliency
-        item.saliency = compute_saliency(
-            item=item,
-            utterance=utterance,
-            decay_factor=decay_factor,
-            b=b,
-            c=c
-        )
\ No newline at end of file
+    # Skip items that were created after the utterance
+    # This can happen if the utterance is from a previous turn
+    items = [
+        item for item in items
+        if utterance.turn_number >= item.last_accessed_turn and item.embedding is not None
+    ]
+    if not items:
+        return
+    
+    interpretation_embedding = getattr(utterance, 'interpretation_embedding', None)
+    if interpretation_embedding is None:
+        interpretation_embedding = utterance.embedding
+    
+    # Score all items in one vectorized pass
+    saliencies = saliency_scores(
+        embeddings=np.stack([item.embedding for item in items]),
+        interpretation_query=interpretation_embedding,
+        text_query=utterance.embedding,
+        weights=np.array([getattr(item, 'weight', 1.0) for item in items], dtype=np.float32),
+        last_accessed_turns=np.array([item.last_accessed_turn for item in items], dtype=np.int64),
+        current_turn=utterance.turn_number,
+        decay_factor=decay_factor,
+        b=b,
+        c=c
+    )
+    for item, saliency in zip(items, saliencies):
+        item.saliency = float(saliency)
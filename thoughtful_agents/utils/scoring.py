@@ -0,0 +1,157 @@
+"""Vectorized saliency scoring over stacked embeddings.
+
+Uses a Numba-compiled kernel when numba is installed and falls back to NumPy otherwise.
+"""
+from typing import Tuple
+import numpy as np
+from numpy.typing import NDArray
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+def _saliency_numpy(
+    embeddings: NDArray[np.float32],
+    interpretation_query: NDArray[np.float32],
+    text_query: NDArray[np.float32],
+    weights: NDArray[np.float32],
+    last_accessed_turns: NDArray[np.int64],
+    current_turn: int,
+    decay_factor: float,
+    b: float,
+    c: float,
+    normalized: bool = False
+) -> NDArray[np.float32]:
+    """NumPy implementation of saliency_scores."""
+    dots = embeddings @ np.stack([interpretation_query, text_query], axis=1)
+    query_norms = np.array([np.linalg.norm(interpretation_query), np.linalg.norm(text_query)], dtype=np.float32)
+    if normalized:
+        # Unit-length rows: cosine is the dot product over the query norm
+        denominators = np.broadcast_to(query_norms[None, :], dots.shape)
+    else:
+        norms = np.sqrt(np.einsum("ij,ij->i", embeddings, embeddings))
+        denominators = norms[:, None] * query_norms[None, :]
+    similarities = np.divide(dots, denominators, out=np.zeros_like(dots), where=denominators > 0)
+
+    turns_elapsed = np.maximum(0, current_turn - last_accessed_turns)
+    decay = np.power(decay_factor, turns_elapsed, dtype=np.float32)
+    return (np.maximum(b * similarities[:, 0], c * similarities[:, 1]) * weights * decay).astype(np.float32)
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _saliency_numba(embeddings, interpretation_query, text_query, weights, last_accessed_turns, current_turn, decay_factor, b, c, normalized):
+        n, d = embeddings.shape
+        interpretation_norm = np.sqrt(np.sum(interpretation_query * interpretation_query))
+        text_norm = np.sqrt(np.sum(text_query * text_query))
+        out = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            # Both dot products (and the row norm, unless rows are unit length) in a single pass over the row
+            dot_interpretation = 0.0
+            dot_text = 0.0
+            norm = 1.0
+            if normalized:
+                for j in range(d):
+                    x = embeddings[i, j]
+                    dot_interpretation += x * interpretation_query[j]
+                    dot_text += x * text_query[j]
+            else:
+                norm = 0.0
+                for j in range(d):
+                    x = embeddings[i, j]
+                    dot_interpretation += x * interpretation_query[j]
+                    dot_text += x * text_query[j]
+                    norm += x * x
+                norm = np.sqrt(norm)
+
+            similarity_interpretation = 0.0
+            similarity_text = 0.0
+            if norm > 0 and interpretation_norm > 0:
+                similarity_interpretation = dot_interpretation / (norm * interpretation_norm)
+            if norm > 0 and text_norm > 0:
+                similarity_text = dot_text / (norm * text_norm)
+
+            turns_elapsed = max(0, current_turn - last_accessed_turns[i])
+            decay = decay_factor ** turns_elapsed
+            out[i] = max(b * similarity_interpretation, c * similarity_text) * weights[i] * decay
+        return out
+
+    def _warm_up_numba() -> None:
+        """Compile (or load from the cache) the kernel for the argument types saliency_scores passes,
+        so the first real scoring call does not pay for it."""
+        embeddings = np.ones((1, 2), dtype=np.float32)
+        query = np.ones(2, dtype=np.float32)
+        _saliency_numba(embeddings, query, query, np.ones(1, dtype=np.float32), np.zeros(1, dtype=np.int64),
+                        0, 1.0, 1.0, 1.0, True)
+
+    _warm_up_numba()
+
+def saliency_scores(
+    embeddings: NDArray[np.float32],
+    interpretation_query: NDArray[np.float32],
+    text_query: NDArray[np.float32],
+    weights: NDArray[np.float32],
+    last_accessed_turns: NDArray[np.int64],
+    current_turn: int,
+    decay_factor: float = 1.0,
+    b: float = 1.0,
+    c: float = 1.0,
+    normalized: bool = False
+) -> NDArray[np.float32]:
+    """Compute saliency for many items at once.
+
+    Saliency = max(b * cos(item, interpretation), c * cos(item, text)) * weight * decay
+    where decay = decay_factor^max(0, current_turn - last_accessed_turn)
+
+    Args:
+        embeddings: (N, d) matrix of item embeddings
+        interpretation_query: Embedding of the utterance interpretation
+        text_query: Embedding of the utterance text
+        weights: (N,) item weights
+        last_accessed_turns: (N,) turn each item was last accessed
+        current_turn: Turn number of the utterance
+        decay_factor: Factor for time-based decay (default: 1.0)
+        b: Weight for interpretation similarity (default: 1.0)
+        c: Weight for text similarity (default: 1.0)
+        normalized: Whether the embeddings are already unit length, so their norms
+            need not be computed; only pass True if they are (default: False)
+
+    Returns:
+        (N,) array of saliency values
+    """
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    interpretation_query = np.ascontiguousarray(interpretation_query, dtype=np.float32)
+    text_query = np.ascontiguousarray(text_query, dtype=np.float32)
+    weights = np.ascontiguousarray(weights, dtype=np.float32)
+    last_accessed_turns = np.ascontiguousarray(last_accessed_turns, dtype=np.int64)
+
+    if len(embeddings) == 0:
+        return np.empty(0, dtype=np.float32)
+    if NUMBA_AVAILABLE:
+        # Arguments are cast so every call matches the specialization compiled at import
+        return _saliency_numba(embeddings, interpretation_query, text_query, weights, last_accessed_turns,
+                               int(current_turn), float(decay_factor), float(b), float(c), bool(normalized))
+    return _saliency_numpy(embeddings, interpretation_query, text_query, weights, last_accessed_turns,
+                           current_turn, decay_factor, b, c, normalized)
+
+def topk_indices(scores: NDArray[np.float32], k: int, threshold: float = -np.inf) -> Tuple[NDArray[np.intp], NDArray[np.float32]]:
+    """Find the k highest scores that are at least the threshold.
+
+    Args:
+        scores: (N,) array of scores
+        k: Maximum number of results
+        threshold: Minimum score to include (default: no threshold)
+
+    Returns:
+        Tuple of (indices, scores), sorted by descending score
+    """
+    candidates = np.flatnonzero(scores >= threshold)
+    k = min(k, len(candidates))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+
+    # Partial selection of the top k, then sort only those k (ties by index)
+    top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    top = top[np.lexsort((top, -scores[top]))]
+    return top, scores[top]
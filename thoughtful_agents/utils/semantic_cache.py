@@ -0,0 +1,223 @@
+"""Caches for embeddings and interpretations to avoid repeated API calls."""
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict, deque
+from itertools import combinations
+import hashlib
+import logging
+import os
+import numpy as np
+from numpy.typing import NDArray
+
+logger = logging.getLogger(__name__)
+
+class ExactEmbedCache:
+    """LRU cache of embeddings keyed by a hash of the model name and text.
+
+    With a disk_dir, embeddings are also written there as .npy files so they
+    survive restarts; in-memory misses fall back to disk. When the directory
+    grows past max_disk_bytes, the least recently used files are deleted.
+    """
+
+    def __init__(self, capacity: int = 10000, disk_dir: Optional[str] = None, max_disk_bytes: int = 1 << 30):
+        """Initialize the cache.
+
+        Args:
+            capacity: Maximum number of embeddings to keep in memory (default: 10000)
+            disk_dir: Directory for the on-disk cache; None keeps the cache in memory only (default: None)
+            max_disk_bytes: Maximum total size of the on-disk cache (default: 1 GiB)
+        """
+        self.capacity = capacity
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._entries: "OrderedDict[bytes, NDArray[np.float32]]" = OrderedDict()
+        self._disk_bytes: Optional[int] = None  # Measured on first write
+
+    @staticmethod
+    def _key(text: str, model: str) -> bytes:
+        return hashlib.blake2b(f"{model}\0{text}".encode(), digest_size=16).digest()
+
+    def _path(self, key: bytes) -> str:
+        return os.path.join(self.disk_dir, f"{key.hex()}.npy")
+
+    def get(self, text: str, model: str) -> Optional[NDArray[np.float32]]:
+        """Get the cached embedding for a text, or None if it is not cached."""
+        key = self._key(text, model)
+        embedding = self._entries.get(key)
+        if embedding is not None:
+            self._entries.move_to_end(key)
+        elif self.disk_dir is not None:
+            embedding = self._load(key)
+            if embedding is not None:
+                self._remember(key, embedding)
+        return embedding
+
+    def put(self, text: str, model: str, embedding: NDArray[np.float32]) -> None:
+        """Cache the embedding for a text, evicting the least recently used entry if full."""
+        key = self._key(text, model)
+        self._remember(key, embedding)
+        if self.disk_dir is not None:
+            self._save(key, embedding)
+
+    def _remember(self, key: bytes, embedding: NDArray[np.float32]) -> None:
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def _load(self, key: bytes) -> Optional[NDArray[np.float32]]:
+        path = self._path(key)
+        try:
+            embedding = np.load(path)
+            os.utime(path)  # Mark as recently used for disk eviction
+        except (OSError, ValueError):
+            return None
+        # Match embeddings decoded from the API, which are read-only
+        embedding.setflags(write=False)
+        return embedding
+
+    def _save(self, key: bytes, embedding: NDArray[np.float32]) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(entry.stat().st_size for entry in os.scandir(self.disk_dir) if entry.is_file())
+            # Write to a temporary file first so readers never see a partial file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, np.asarray(embedding, dtype=np.float32))
+            os.replace(tmp_path, path)
+            self._disk_bytes += os.path.getsize(path)
+        except OSError as e:
+            logger.warning(f"Could not write embedding to disk cache: {str(e)}")
+            return
+        if self._disk_bytes > self.max_disk_bytes:
+            self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """Delete the least recently used files until the disk cache is at 90% of its limit."""
+        entries = sorted(
+            (entry for entry in os.scandir(self.disk_dir) if entry.is_file() and entry.name.endswith(".npy")),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        total = sum(entry.stat().st_size for entry in entries)
+        target = int(self.max_disk_bytes * 0.9)
+        for entry in entries:
+            if total <= target:
+                break
+            size = entry.stat().st_size
+            try:
+                os.remove(entry.path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+    def clear(self) -> None:
+        """Remove all embeddings cached in memory (the disk cache is kept)."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class SemanticInterpCache:
+    """Cache of interpretations keyed by utterance embedding.
+
+    Embeddings are bucketed with random-projection LSH; a lookup probes the
+    query bucket and its neighbors (buckets within probe_radius bit flips) and
+    returns the first interpretation whose embedding has cosine similarity of at
+    least threshold with the query and whose context matches. The context holds
+    whatever else the interpretation depends on (e.g. the speaker and the
+    conversation history), so entries never leak across speakers or conversations.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        num_bits: int = 16,
+        probe_radius: int = 1,
+        capacity: int = 10000,
+        seed: int = 0
+    ):
+        """Initialize the cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a cache hit (default: 0.95)
+            num_bits: Number of random hyperplanes used for hashing (default: 16)
+            probe_radius: Maximum number of flipped bits when probing neighboring buckets (default: 1)
+            capacity: Maximum number of entries to keep; the oldest entry is evicted first (default: 10000)
+            seed: Seed for the random projection (default: 0)
+        """
+        self.threshold = threshold
+        self.num_bits = num_bits
+        self.probe_radius = probe_radius
+        self.capacity = capacity
+        self._rng = np.random.default_rng(seed)
+        # The projection is created lazily once the embedding dimension is known
+        self._projection: Optional[NDArray[np.float32]] = None
+        self._buckets: Dict[bytes, List[Tuple[NDArray[np.float32], bytes, str]]] = {}
+        self._order: deque = deque()  # bucket keys in insertion order
+
+    def _hash_bits(self, embedding: NDArray[np.float32]) -> NDArray[np.bool_]:
+        if self._projection is None:
+            self._projection = self._rng.standard_normal((embedding.shape[0], self.num_bits)).astype(np.float32)
+        return (embedding @ self._projection) > 0
+
+    def _probe_keys(self, bits: NDArray[np.bool_]) -> List[bytes]:
+        keys = [np.packbits(bits).tobytes()]
+        for radius in range(1, self.probe_radius + 1):
+            for positions in combinations(range(self.num_bits), radius):
+                flipped = bits.copy()
+                flipped[list(positions)] ^= True
+                keys.append(np.packbits(flipped).tobytes())
+        return keys
+
+    @staticmethod
+    def _context_key(context: str) -> bytes:
+        return hashlib.blake2b(context.encode("utf-8"), digest_size=16).digest()
+
+    @staticmethod
+    def _normalize(embedding: NDArray[np.float32]) -> NDArray[np.float32]:
+        embedding = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm > 0 else embedding
+
+    def get(self, embedding: NDArray[np.float32], context: str = "") -> Optional[str]:
+        """Get a cached interpretation for a semantically similar utterance in the same context, or None."""
+        if self._projection is None:
+            return None
+        query = self._normalize(embedding)
+        context_key = self._context_key(context)
+        for key in self._probe_keys(self._hash_bits(query)):
+            for cached_embedding, cached_context, interpretation in self._buckets.get(key, ()):
+                if cached_context == context_key and float(cached_embedding @ query) >= self.threshold:
+                    return interpretation
+        return None
+
+    def put(self, embedding: NDArray[np.float32], interpretation: str, context: str = "") -> None:
+        """Cache the interpretation of an utterance with the given embedding and context."""
+        normalized = self._normalize(embedding)
+        key = np.packbits(self._hash_bits(normalized)).tobytes()
+        entry = (normalized, self._context_key(context), interpretation)
+        self._buckets.setdefault(key, []).append(entry)
+        self._order.append(key)
+
+        if len(self._order) > self.capacity:
+            old_key = self._order.popleft()
+            bucket = self._buckets[old_key]
+            # Entries are appended in insertion order, so the oldest is first in its bucket
+            bucket.pop(0)
+            if not bucket:
+                del self._buckets[old_key]
+
+    def clear(self) -> None:
+        """Remove all cached interpretations."""
+        self._buckets.clear()
+        self._order.clear()
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+# Shared caches used by the LLM API helpers and the conversation model. Set
+# EMBEDDING_CACHE_DIR to also keep embeddings on disk across runs.
+embedding_cache = ExactEmbedCache(disk_dir=os.getenv("EMBEDDING_CACHE_DIR"))
+interpretation_cache = SemanticInterpCache()
@@ -1,8 +1,16 @@
 """Text splitting utilities using spaCy."""
 from typing import List
+import re
 import spacy
 from spacy.language import Language
 
+# Paragraph break: a blank line, possibly containing whitespace
+_PARAGRAPH_BREAK_RE = re.compile(r"\n\s*\n")
+
+def _doc_sentences(doc) -> List[str]:
+    """Get the stripped, non-empty sentences of a spaCy doc."""
+    return [sentence for sent in doc.sents if (sentence := sent.text.strip())]
+
 class SentenceSplitter:
     """Split text into sentences using spaCy's sentencizer component."""
     
@@ -21,6 +29,17 @@ class SentenceSplitter:
         # Make sure the sentencizer is added to the pipeline
         if "sentencizer" not in self.nlp.pipe_names:
             sentencizer = self.nlp.add_pipe("sentencizer")
+        
+        # When the sentencizer is the only component setting sentence boundaries, text
+        # without any of its punctuation characters is a single sentence and can skip spaCy
+        if "parser" in self.nlp.pipe_names or "senter" in self.nlp.pipe_names:
+            self._punct_chars = None
+        else:
+            self._punct_chars = frozenset(self.nlp.get_pipe("sentencizer").punct_chars)
+    
+    def _is_single_sentence(self, text: str) -> bool:
+        """Check, without running spaCy, whether text cannot contain a sentence boundary."""
+        return self._punct_chars is not None and self._punct_chars.isdisjoint(text)
     
     def split_sentences(self, text: str) -> List[str]:
         """Split text into sentences using spaCy.
@@ -33,9 +52,10 @@ class SentenceSplitter:
         """
         if not text:
             return []
+        if self._is_single_sentence(text):
+            return [sentence] if (sentence := text.strip()) else []
         
-        doc = self.nlp(text)
-        return [sent.text.strip() for sent in doc.sents]
+        return _doc_sentences(self.nlp(text))
     
     def split_paragraphs(self, text: str) -> List[str]:
         """Split text into paragraphs based on double newlines.
@@ -49,7 +69,7 @@ class SentenceSplitter:
         if not text:
             return []
         
-        return [p.strip() for p in text.split("\n\n") if p.strip()]
+        return [paragraph for p in _PARAGRAPH_BREAK_RE.split(text) if (paragraph := p.strip())]
     
     def split_text(self, text: str, by_paragraphs: bool = True) -> List[str]:
         """Split text into sentences and optionally paragraphs.
@@ -65,11 +85,16 @@ class SentenceSplitter:
             return []
         
         if by_paragraphs:
-            # First split by paragraphs, then by sentences within each paragraph
+            # First split by paragraphs, then by sentences within each paragraph,
+            # running the paragraphs that may hold several sentences through spaCy as one batch
             paragraphs = self.split_paragraphs(text)
+            docs = iter(self.nlp.pipe(p for p in paragraphs if not self._is_single_sentence(p)))
             result = []
             for paragraph in paragraphs:
-                result.extend(self.split_sentences(paragraph))
+                if self._is_single_sentence(paragraph):
+                    result.append(paragraph)
+                else:
+                    result.extend(_doc_sentences(next(docs)))
             return result
         else:
             # Just split by sentences
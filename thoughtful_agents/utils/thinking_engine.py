@@ -33,9 +33,7 @@ async def generate_system1_thought(
     overall_context = conversation.context  
     # Get conversation history
     last_events = conversation.get_last_n_events(5)
-    conversation_history = ""
-    for event in last_events:
-        conversation_history += f"{event.participant_name}: {event.content}\n"
+    conversation_history = conversation.get_conversation_history(5)
     
     # Create the prompt
     system_prompt = f"""You are playing a role as a participant in an online multi-party conversation. Your name in the conversation is {agent.name}.
@@ -83,8 +81,9 @@ Respond with a JSON object in the following format:
             last_accessed_turn=conversation.turn_number,
             intrinsic_motivation={"reasoning": "Default motivation before evaluation", "score": -1.0},
             stimuli=last_events,
-            compute_embedding=True
+            compute_embedding=False
         )
+        await thought.compute_embedding_async()
         
         return thought
         
@@ -114,27 +113,21 @@ async def generate_system2_thoughts(
     
     # Get conversation history
     last_events = conversation.get_last_n_events(5)
-    conversation_history = ""
-    for i, event in enumerate(last_events):
-        conversation_history += f"CON#{event.id}: {event.participant_name}: {event.content}\n"
+    conversation_history = "".join(f"CON#{event.id}: {event.participant_name}: {event.content}\n" for event in last_events)
     
     # Get salient memories
     salient_memories = memory_store.retrieve_top_k(k=5, threshold=0.25, memory_type=MentalObjectType.MEMORY_LONG_TERM)
     # update last_accessed_turn of each memory
     for memory in salient_memories:
         memory.last_accessed_turn = conversation.turn_number
-    memories_text = ""
-    for i, memory in enumerate(salient_memories):
-        memories_text += f"MEM#{memory.id}: {memory.content}\n"
+    memories_text = "".join(f"MEM#{memory.id}: {memory.content}\n" for memory in salient_memories)
     
     # Get previous thoughts
     previous_thoughts = thought_reservoir.retrieve_top_k(k=3, threshold=0.25, thought_type=MentalObjectType.THOUGHT_SYSTEM2)
     # update last_accessed_turn of each thought
     for thought in previous_thoughts:
         thought.last_accessed_turn = conversation.turn_number
-    thoughts_text = ""
-    for i, thought in enumerate(previous_thoughts):
-        thoughts_text += f"THO#{thought.id}: {thought.content}\n"
+    thoughts_text = "".join(f"THO#{thought.id}: {thought.content}\n" for thought in previous_thoughts)
     
     # Create the prompt
     system_prompt = f"""You are playing a role as a participant in an online multi-party conversation. Your name in the conversation is {agent.name}.
@@ -236,7 +229,7 @@ Respond with a JSON object in the following format:
                         stimuli_objects.append(matching_thought)
             
             # Create the thought
-            return Thought(
+            thought = Thought(
                 agent_id=agent.id,
                 type=MentalObjectType.THOUGHT_SYSTEM2,
                 content=content,
@@ -244,8 +237,11 @@ Respond with a JSON object in the following format:
                 last_accessed_turn=conversation.turn_number,
                 intrinsic_motivation={"reasoning": "Default motivation before evaluation", "score": -1.0},  # Default value, will be updated by evaluation
                 stimuli=stimuli_objects,
-                compute_embedding=True
+                compute_embedding=False
             )
+            # Embed asynchronously so that concurrent thoughts share one batched request
+            await thought.compute_embedding_async()
+            return thought
         
         # Create thoughts concurrently
         thought_creation_tasks = [create_thought(data) for data in thought_data[:num_thoughts]]
@@ -277,10 +273,7 @@ async def evaluate_thought(
     
     overall_context = conversation.context
     # Get conversation history
-    last_events = conversation.get_last_n_events(5)
-    conversation_history = ""
-    for event in last_events:
-        conversation_history += f"{event.participant_name}: {event.content}\n"
+    conversation_history = conversation.get_conversation_history(5)
     
     # Access memory_store directly from the agent
     memory_store = agent.memory_store
@@ -438,10 +431,7 @@ async def articulate_thought(
     """
     overall_context = conversation.context  
     # Get conversation history
-    last_events = conversation.get_last_n_events(5)
-    conversation_history = ""
-    for event in last_events:
-        conversation_history += f"{event.participant_name}: {event.content}\n"
+    conversation_history = conversation.get_conversation_history(5)
 
     # Get long-term memories
     memory_store = agent.memory_store
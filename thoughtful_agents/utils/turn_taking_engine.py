@@ -29,9 +29,7 @@ async def predict_turn_taking_type(conversation: 'Conversation') -> str:
     """
     # Get the last 5 utterances
     last_events = conversation.get_last_n_events(5)
-    last_5_utterances = ""
-    for event in last_events:
-        last_5_utterances += f"{event.participant_name}: {event.content}\n"
+    last_5_utterances = conversation.get_conversation_history(5)
     
     # Get the participants
     participants = conversation.participants
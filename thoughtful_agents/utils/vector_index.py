@@ -0,0 +1,170 @@
+"""Cosine top-k search index, backed by faiss when it is installed."""
+from typing import List, Optional, Tuple, Union
+import logging
+import numpy as np
+from numpy.typing import NDArray
+
+from thoughtful_agents.utils.embedding_matrix import EmbeddingMatrix, normalize_embedding
+
+# Disable faiss loader logs (it reports every instruction set it probes)
+logging.getLogger("faiss.loader").setLevel(logging.WARNING)
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+def _as_unit(embedding: Union[NDArray[np.float32], List[float]]) -> NDArray[np.float32]:
+    """Return the embedding as a unit-length float32 array, copying only if it is not one already."""
+    embedding = np.asarray(embedding, dtype=np.float32)
+    if abs(float(embedding @ embedding) - 1.0) > 1e-4:
+        embedding = normalize_embedding(embedding)
+    return embedding
+
+class VectorIndex:
+    """Append-only index for cosine top-k search.
+
+    With faiss installed, vectors are kept in a faiss.IndexFlatIP, which is
+    replaced by an HNSW graph once the index holds hnsw_threshold vectors.
+    Otherwise vectors are kept in an EmbeddingMatrix and searched with NumPy.
+    Rows are numbered in insertion order for both backends.
+    
+    With quantize=True, both backends store one byte per component: the NumPy
+    backend as int8 rows with a per-row scale, faiss with an 8-bit scalar
+    quantizer over the [-1, 1] range of unit vector components.
+    """
+
+    def __init__(
+        self,
+        quantize: bool = False,
+        use_faiss: Optional[bool] = None,
+        hnsw_threshold: int = 10000,
+        hnsw_m: int = 32,
+        matrix: Optional[EmbeddingMatrix] = None
+    ):
+        """Initialize an empty index.
+
+        Args:
+            quantize: Whether to store 8-bit rows instead of float32 (default: False)
+            use_faiss: Whether to use faiss; None uses it if installed (default: None)
+            hnsw_threshold: Number of vectors at which faiss switches to an HNSW index (default: 10000)
+            hnsw_m: Number of neighbors per node in the HNSW graph (default: 32)
+            matrix: Existing matrix of unit-length rows to search with the NumPy backend
+                instead of a copy; added embeddings are appended to it. Implies
+                use_faiss=False and the matrix's own quantization (default: None)
+        """
+        if matrix is not None:
+            use_faiss = False
+            quantize = matrix.quantize
+        self.use_faiss = FAISS_AVAILABLE if use_faiss is None else use_faiss
+        if self.use_faiss and not FAISS_AVAILABLE:
+            raise ImportError("faiss is not installed; install faiss-cpu or set use_faiss=False")
+        self.quantize = quantize
+        self.hnsw_threshold = hnsw_threshold
+        self.hnsw_m = hnsw_m
+        self._matrix = matrix if matrix is not None else EmbeddingMatrix(quantize=quantize)
+        self._index = None
+        self._size = len(self._matrix)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def matrix(self) -> EmbeddingMatrix:
+        """The matrix searched by the NumPy backend (unused with faiss)."""
+        return self._matrix
+
+    def add(self, embedding: Union[NDArray[np.float32], List[float]]) -> int:
+        """Add an embedding to the index.
+
+        Args:
+            embedding: The embedding to add
+
+        Returns:
+            The row index of the added embedding
+        """
+        # Embeddings are normalized at ingest, so this is usually copy-free
+        embedding = _as_unit(embedding)
+        if not self.use_faiss:
+            self._size += 1
+            return self._matrix.append(embedding)
+
+        if self._index is None:
+            self._index = self._new_faiss_index(len(embedding))
+        self._index.add(embedding[None, :])
+        self._size += 1
+
+        if self._size == self.hnsw_threshold:
+            self._switch_to_hnsw()
+        return self._size - 1
+
+    def add_many(self, embeddings: Union[NDArray[np.float32], List[List[float]]]) -> None:
+        """Add several embeddings to the index in one batch.
+
+        Args:
+            embeddings: (M, d) embeddings to add; rows are numbered in order after the existing ones
+        """
+        embeddings = np.array(embeddings, dtype=np.float32)
+        if len(embeddings) == 0:
+            return
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        np.divide(embeddings, norms, out=embeddings, where=norms > 0)
+        if not self.use_faiss:
+            self._matrix.extend(embeddings)
+            self._size += len(embeddings)
+            return
+
+        if self._index is None:
+            self._index = self._new_faiss_index(embeddings.shape[1])
+        was_flat = self._size < self.hnsw_threshold
+        self._index.add(embeddings)
+        self._size += len(embeddings)
+
+        if was_flat and self._size >= self.hnsw_threshold:
+            self._switch_to_hnsw()
+
+    def _new_faiss_index(self, dim: int, hnsw: bool = False) -> "faiss.Index":
+        """Create an empty faiss index for unit vectors of the given dimension."""
+        if not self.quantize:
+            if hnsw:
+                return faiss.IndexHNSWFlat(dim, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            return faiss.IndexFlatIP(dim)
+        
+        if hnsw:
+            index = faiss.IndexHNSWSQ(dim, faiss.ScalarQuantizer.QT_8bit, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+        # Unit vector components lie in [-1, 1], so train on that range instead of
+        # on data, which would clip vectors added later
+        index.train(np.stack([np.full(dim, -1.0, dtype=np.float32), np.ones(dim, dtype=np.float32)]))
+        return index
+
+    def _switch_to_hnsw(self) -> None:
+        """Rebuild the flat faiss index as an HNSW graph for sublinear search."""
+        vectors = self._index.reconstruct_n(0, self._index.ntotal)
+        index = self._new_faiss_index(vectors.shape[1], hnsw=True)
+        index.add(vectors)
+        self._index = index
+
+    def search(self, query: Union[NDArray[np.float32], List[float]], k: int) -> Tuple[NDArray[np.intp], NDArray[np.float32]]:
+        """Find the k stored embeddings most similar to a query.
+
+        Args:
+            query: The query embedding
+            k: Number of results
+
+        Returns:
+            Tuple of (row indices, cosine similarities), sorted by descending similarity
+        """
+        query = _as_unit(query)
+        if not self.use_faiss:
+            return self._matrix.topk(query, k)
+
+        k = min(k, self._size)
+        if k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+        scores, indices = self._index.search(query[None, :], k)
+        # faiss pads with -1 when fewer than k results are found
+        found = indices[0] >= 0
+        return indices[0][found].astype(np.intp), scores[0][found]